@@ -0,0 +1,91 @@
+import threading
+from http_session import get_session
+from metrics import get_metrics
+
+
+# Airtable accepts at most 10 records per multi-record PATCH
+MAX_RECORDS_PER_REQUEST = 10
+
+
+class AirtableWriter:
+    """
+    Write-behind buffer for Airtable field updates.
+
+    Updates are merged per record (later values win) and sent as
+    multi-record PATCHes of up to 10 records, either when enough
+    records are pending or when flush() is called.
+
+    `on_sent(chunk)`, if set, is called with the (record_id, fields) pairs
+    of each PATCH Airtable accepted (e.g. to update a local mirror).
+    """
+
+    def __init__(self, table_url: str, headers: dict, limiter=None,
+                 flush_threshold: int = MAX_RECORDS_PER_REQUEST, on_sent=None):
+        self.table_url = table_url
+        self.headers = headers
+        self.limiter = limiter
+        self.flush_threshold = flush_threshold
+        self.on_sent = on_sent
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Serialises flushes so two updates of the same record cannot be
+        # sent out of order by concurrent threads.
+        self._flush_lock = threading.Lock()
+
+    def update(self, record_id: str, fields: dict, flush: bool = False):
+        """Queue a field update; send it right away when `flush` is True."""
+        with self._lock:
+            self._pending.setdefault(record_id, {}).update(fields)
+            full = len(self._pending) >= self.flush_threshold
+
+        if flush:
+            self.flush([record_id])
+        elif full:
+            # Failed records are requeued and sent again by the next
+            # flush; the caller's job should not fail because of others.
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Airtable flush failed, will retry on next flush: {e}")
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, record_ids=None):
+        """Send pending updates (all of them, or only `record_ids`)."""
+        with self._flush_lock:
+            with self._lock:
+                ids = list(self._pending) if record_ids is None else [
+                    r for r in record_ids if r in self._pending
+                ]
+                batch = [(r, self._pending.pop(r)) for r in ids]
+
+            for start in range(0, len(batch), MAX_RECORDS_PER_REQUEST):
+                chunk = batch[start:start + MAX_RECORDS_PER_REQUEST]
+                try:
+                    self._patch(chunk)
+                except Exception:
+                    self._requeue(batch[start:])
+                    raise
+
+    def _patch(self, chunk):
+        payload = {
+            "records": [{"id": r, "fields": fields} for r, fields in chunk]
+        }
+        if self.limiter:
+            self.limiter.acquire()
+        with get_metrics().span("airtable_patch", records=len(chunk)):
+            response = get_session().patch(self.table_url, headers=self.headers, json=payload)
+            response.raise_for_status()
+
+        if self.on_sent is not None:
+            self.on_sent(chunk)
+
+    def _requeue(self, batch):
+        """Put unsent updates back without overriding newer values."""
+        with self._lock:
+            for record_id, fields in batch:
+                newer = self._pending.get(record_id, {})
+                self._pending[record_id] = {**fields, **newer}
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+from openai.types.chat import ChatCompletion
+from llm_cache import cache_key
+from llm_dispatcher import DEFAULT_MODEL, get_dispatcher
+from metrics import get_metrics
+from cost_ledger import usage_context
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Input / output JSONL files are kept here for inspection
+BATCH_DIR = "exports/batch"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_POLL_SECONDS = float(os.getenv("OPENAI_BATCH_POLL_SECONDS", "30"))
+
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+# ==============================
+# Batch file
+# ==============================
+
+def write_batch_file(path: str, requests: list, model: str = DEFAULT_MODEL):
+    """
+    Write chat requests to a Batch API JSONL file.
+    `requests` is a list of (custom_id, messages, temperature).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, messages, temperature in requests:
+            line = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": model,
+                    "messages": messages,
+                    "temperature": temperature,
+                },
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def parse_batch_output(content: str) -> dict:
+    """Map custom_id -> ChatCompletion, or an error message (str)."""
+    results = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+
+        if item.get("error") or response.get("status_code") != 200:
+            error = item.get("error") or response.get("body", {}).get("error")
+            results[item["custom_id"]] = f"Batch request failed: {error}"
+        else:
+            results[item["custom_id"]] = ChatCompletion.model_validate(response["body"])
+    return results
+
+
+# ==============================
+# Batch API
+# ==============================
+
+def submit_batch(path: str) -> str:
+    client = get_dispatcher().client
+
+    with open(path, "rb") as f:
+        batch_file = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, poll_seconds: float = BATCH_POLL_SECONDS):
+    client = get_dispatcher().client
+
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in FINAL_STATUSES:
+            return batch
+        print(f"→ Batch {batch_id}: {batch.status}")
+        time.sleep(poll_seconds)
+
+
+def fetch_batch_results(batch) -> dict:
+    client = get_dispatcher().client
+
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            results.update(parse_batch_output(client.files.content(file_id).text))
+    return results
+
+
+def run_batch(name: str, requests: list, model: str = DEFAULT_MODEL,
+              poll_seconds: float = BATCH_POLL_SECONDS) -> dict:
+    """
+    Run chat requests through the Batch API.
+    Returns custom_id -> output text, or an Exception for failed requests.
+
+    Requests already in the LLM cache are not submitted, and fresh
+    outputs are added to it.
+    """
+    dispatcher = get_dispatcher()
+    outputs = {}
+    pending = []
+
+    for custom_id, messages, temperature in requests:
+        cached = None
+        if dispatcher.use_cache:
+            cached = dispatcher.cache.get(cache_key(model, messages, temperature))
+        if cached is not None:
+            outputs[custom_id] = cached
+        else:
+            pending.append((custom_id, messages, temperature))
+
+    if not pending:
+        return outputs
+
+    path = os.path.join(BATCH_DIR, f"{name}_{int(time.time())}.jsonl")
+    write_batch_file(path, pending, model=model)
+
+    metrics = get_metrics()
+    with metrics.span("batch_submit", batch=name, requests=len(pending)):
+        batch_id = submit_batch(path)
+    print(f"→ Batch {batch_id} submitted ({len(pending)} request(s))")
+
+    with metrics.span("batch_wait", batch=name, batch_id=batch_id) as span:
+        batch = wait_for_batch(batch_id, poll_seconds=poll_seconds)
+        span["batch_status"] = batch.status
+    results = fetch_batch_results(batch) if batch.status == "completed" else {}
+
+    for custom_id, messages, temperature in pending:
+        result = results.get(custom_id)
+
+        if result is None:
+            outputs[custom_id] = RuntimeError(f"Batch {batch_id} {batch.status}: no result")
+        elif isinstance(result, str):
+            outputs[custom_id] = RuntimeError(result)
+        else:
+            with usage_context(custom_id, name):
+                dispatcher.record_usage(model, result.usage, batch=True)
+            text = result.choices[0].message.content.strip()
+            if dispatcher.use_cache:
+                dispatcher.cache.put(cache_key(model, messages, temperature), text)
+            outputs[custom_id] = text
+
+    return outputs
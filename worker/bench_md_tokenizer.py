@@ -0,0 +1,148 @@
+import re
+import time
+from md_tokenizer import tokenize_cv, tokenize_letter
+
+
+# ======================
+# Previous implementation (kept for comparison only)
+# ======================
+
+def legacy_strip_md(text: str) -> str:
+    if not text:
+        return ""
+    text = text.strip()
+    text = re.sub(r"^\*\*(.+?)\*\*$", r"\1", text)
+    text = re.sub(r"^\*(.+?)\*$", r"\1", text)
+    text = re.sub(r"^#+\s*", "", text)
+    return text.strip()
+
+
+def legacy_is_section_title(line: str) -> bool:
+    clean = legacy_strip_md(line)
+    letters = [c for c in clean if c.isalpha()]
+    return (
+        len(clean) < 40
+        and letters
+        and all(c.upper() == c for c in letters)
+    )
+
+
+def legacy_split_cv_blocks(markdown_text: str):
+    lines = markdown_text.splitlines()
+    identity = []
+    i = 0
+    while i < len(lines) and lines[i].strip() == "":
+        i += 1
+    while i < len(lines):
+        identity.append(lines[i])
+        i += 1
+        if i < len(lines) and lines[i].strip() == "" and len([x for x in identity if x.strip()]) >= 2:
+            identity.append(lines[i])
+            i += 1
+            break
+    while i < len(lines) and lines[i].strip() == "":
+        i += 1
+    intro_parts = []
+    while i < len(lines) and lines[i].strip() != "":
+        intro_parts.append(lines[i].strip())
+        i += 1
+    intro_text = " ".join(intro_parts).strip()
+    while i < len(lines) and lines[i].strip() == "":
+        i += 1
+    body = lines[i:] if i < len(lines) else []
+    return identity, intro_text, body
+
+
+def legacy_cv_pass(markdown_text: str):
+    """Parsing work done by the previous export_markdown_to_pdf."""
+    identity_lines, intro_text, body_lines = legacy_split_cv_blocks(markdown_text)
+    out = [legacy_strip_md(next(l for l in identity_lines if l.strip()))]
+    out += [legacy_strip_md(l) for l in identity_lines]
+    out.append(legacy_strip_md(intro_text))
+    for line in body_lines:
+        raw = line.strip()
+        if not raw:
+            continue
+        if legacy_is_section_title(raw):
+            out.append(legacy_strip_md(raw))
+        elif raw.startswith("•"):
+            out.append(legacy_strip_md(raw[1:]))
+        else:
+            out.append(legacy_strip_md(raw))
+    return out
+
+
+def legacy_letter_pass(markdown_text: str):
+    """Parsing work done by the previous export_letter_to_pdf."""
+    blocks = []
+    current = []
+    for line in [l.rstrip() for l in markdown_text.strip().splitlines()]:
+        if line.strip() == "":
+            if current:
+                blocks.append(current)
+                current = []
+        else:
+            current.append(line)
+    if current:
+        blocks.append(current)
+    out = []
+    for block in blocks[3:]:
+        out.append(("signature" if block == blocks[-1] else "body", "<br/>".join(block)))
+    return out
+
+
+# ======================
+# Synthetic inputs
+# ======================
+
+def synthetic_cv(size_kb: int) -> str:
+    """CV of about `size_kb` KB: identity block then repeated sections."""
+    sep = "\n\n"
+    parts = ["**JEAN DUPONT - Ingénieur chimiste**", "Téléphone : 06 00 00 00 00\nEmail : jean@example.com"]
+    section = 0
+    while len(sep.join(parts)) < size_kb * 1024:
+        section += 1
+        parts.append(
+            f"## SECTION {section}\n"
+            + "\n".join(f"• Réalisation **{section}.{k}** en laboratoire" for k in range(8))
+            + "\nParagraphe descriptif de l'expérience professionnelle."
+        )
+    return sep.join(parts)
+
+
+def synthetic_letter(size_kb: int) -> str:
+    parts = ["Paris, le 1 janvier 2025", "Service RH\nSociété", "Objet : Candidature"]
+    while len("\n\n".join(parts)) < size_kb * 1024:
+        parts.append(f"Paragraphe {len(parts)} de la lettre,\nsur deux lignes.")
+    parts.append("Cordialement,\nJean Dupont")
+    return "\n\n".join(parts)
+
+
+# ======================
+# Benchmark
+# ======================
+
+def best_of(fn, arg, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes=(1, 10, 50, 200)):
+    cases = []
+    for kb in sizes:
+        cases.append((f"CV {kb} KB", synthetic_cv(kb), legacy_cv_pass, tokenize_cv))
+        cases.append((f"Letter {kb} KB", synthetic_letter(kb), legacy_letter_pass, tokenize_letter))
+
+    print(f"{'input':<32}{'previous (ms)':>15}{'tokenizer (ms)':>16}{'speedup':>10}")
+    for name, text, legacy, new in cases:
+        before = best_of(legacy, text) * 1000
+        after = best_of(new, text) * 1000
+        print(f"{name:<32}{before:>15.2f}{after:>16.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bench_md_tokenizer import synthetic_cv, synthetic_letter
+
+
+# ======================
+# Configuration
+# ======================
+
+BASELINE_PATH = "worker/bench_baseline.json"
+
+SIZES_KB = (1, 10, 50, 200)
+
+# Each case runs for about this long (at least MIN_RUNS, at most MAX_RUNS)
+TIME_BUDGET = 1.0
+MIN_RUNS = 5
+MAX_RUNS = 10000
+
+
+# ======================
+# Synthetic inputs
+# ======================
+
+def synthetic_llm_cv(size_kb: int) -> str:
+    """
+    A CV as the model returns it: fenced, with citation markers, the
+    trailing "CV adapté pour..." sentence and the agent instructions block.
+    """
+    lines = synthetic_cv(size_kb).split("\n")
+    lines = [f"[cite_start]{l} [cite: 12]" if l.startswith("•") else l for l in lines]
+    return (
+        "```markdown\n"
+        + "\n".join(lines)
+        + "\n\nCV adapté pour le poste de Ingénieur (H/F)\n\n"
+        + "## AGENT INSTRUCTIONS\nNe pas modifier les dates.\n```"
+    )
+
+
+def job_titles(size_kb: int) -> list:
+    title = "Ingénieur procédés / chimiste (H/F)"
+    return [title] * (size_kb * 1024 // len(title))
+
+
+# ======================
+# Cases
+# ======================
+# Each case builds its input once and returns a callable; one call is one op
+# over a whole document (line-level helpers are applied to every line).
+
+def case_strip_md(size_kb: int):
+    from md_tokenizer import strip_md
+
+    lines = synthetic_cv(size_kb).splitlines()
+    return lambda: [strip_md(l) for l in lines]
+
+
+def case_is_section_title(size_kb: int):
+    from md_tokenizer import is_section_title
+
+    lines = synthetic_cv(size_kb).splitlines()
+    return lambda: [is_section_title(l) for l in lines]
+
+
+def case_split_cv_blocks(size_kb: int):
+    from md_tokenizer import split_cv_blocks
+
+    text = synthetic_cv(size_kb)
+    return lambda: split_cv_blocks(text)
+
+
+def case_worker_cleaners(size_kb: int):
+    """The cleanup chain applied by worker.py to a generated CV."""
+    from worker import (
+        strip_citations,
+        strip_markdown_fences,
+        remove_trailing_ai_sentence,
+        clean_cv_artifacts,
+        extract_cv_title,
+    )
+
+    text = synthetic_llm_cv(size_kb)
+
+    def run():
+        cv = strip_markdown_fences(text)
+        cv = clean_cv_artifacts(strip_citations(cv))
+        cv = remove_trailing_ai_sentence(cv)
+        return extract_cv_title(cv)
+
+    return run
+
+
+def case_clean_job_title(size_kb: int):
+    from worker import clean_job_title
+
+    titles = job_titles(size_kb)
+    return lambda: [clean_job_title(t) for t in titles]
+
+
+def case_export_markdown_to_pdf(size_kb: int):
+    from pdf_exporter import export_markdown_to_pdf
+
+    text = synthetic_cv(size_kb)
+    output_path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "cv.pdf")
+    return lambda: export_markdown_to_pdf(markdown_text=text, output_path=output_path)
+
+
+def case_export_letter_to_pdf(size_kb: int):
+    from pdf_exporter_letter import export_letter_to_pdf
+
+    text = synthetic_letter(size_kb)
+    output_path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "letter.pdf")
+    return lambda: export_letter_to_pdf(text, output_path)
+
+
+CASES = {
+    "strip_md": case_strip_md,
+    "is_section_title": case_is_section_title,
+    "split_cv_blocks": case_split_cv_blocks,
+    "worker_cleaners": case_worker_cleaners,
+    "clean_job_title": case_clean_job_title,
+    "export_markdown_to_pdf": case_export_markdown_to_pdf,
+    "export_letter_to_pdf": case_export_letter_to_pdf,
+}
+
+
+# ======================
+# Measurement
+# ======================
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def significant(value, digits: int = 3):
+    """Round for the baseline file so small noise does not show in diffs."""
+    if value is None or value == 0:
+        return value
+    return float(f"{value:.{digits}g}")
+
+
+def run_case(name: str, size_kb: int, budget: float = TIME_BUDGET) -> dict:
+    """Runs in a fresh process, so peak RSS belongs to this case only."""
+    op = CASES[name](size_kb)
+    op()  # warm-up (imports, style and paragraph caches)
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < MAX_RUNS:
+        t0 = time.perf_counter()
+        op()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= MIN_RUNS and time.perf_counter() - started >= budget:
+            break
+
+    return {
+        "runs": len(samples),
+        "ops_per_sec": significant(len(samples) / sum(samples)),
+        "p50_ms": significant(percentile(samples, 0.50) * 1000),
+        "p99_ms": significant(percentile(samples, 0.99) * 1000),
+        "peak_rss_mb": significant(peak_rss_mb()),
+    }
+
+
+def run_isolated(name: str, size_kb: int, budget: float) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_case, name, size_kb, budget).result()
+
+
+# ======================
+# Baseline
+# ======================
+
+def environment() -> dict:
+    try:
+        from reportlab import Version as reportlab_version
+    except ImportError:
+        reportlab_version = None
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "reportlab": reportlab_version,
+    }
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"environment": environment(), "results": results},
+            f,
+            ensure_ascii=False,
+            indent=2,
+            sort_keys=True,
+        )
+        f.write("\n")
+
+
+def run_suite(names, sizes, budget: float, baseline: dict) -> dict:
+    previous = baseline.get("results", {})
+    results = {}
+
+    print(f"{'case':<36}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>9}{'vs base':>9}")
+    for name in names:
+        for kb in sizes:
+            key = f"{name}/{kb}kb"
+            result = run_isolated(name, kb, budget)
+            results[key] = result
+
+            change = ""
+            before = previous.get(key)
+            if before:
+                change = f"{result['ops_per_sec'] / before['ops_per_sec']:.2f}x"
+
+            rss = result["peak_rss_mb"]
+            print(
+                f"{key:<36}{result['ops_per_sec']:>10.4g}{result['p50_ms']:>10.4g}"
+                f"{result['p99_ms']:>10.4g}{rss if rss is not None else '-':>9}{change:>9}"
+            )
+
+    return results
+
+
+# ======================
+# Entry point
+# ======================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the render and text hot paths")
+    parser.add_argument("--output", default=BASELINE_PATH, help="JSON baseline to compare with and overwrite")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Run only these cases")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES_KB), help="Input sizes in KB")
+    parser.add_argument("--budget", type=float, default=TIME_BUDGET, help="Seconds spent per case")
+    parser.add_argument("--no-save", action="store_true", help="Compare only, leave the baseline untouched")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.output)
+    results = run_suite(args.only or list(CASES), args.sizes, args.budget, baseline)
+
+    if not args.no_save:
+        # Partial runs update their entries and keep the others
+        merged = {**baseline.get("results", {}), **results}
+        save_baseline(args.output, merged)
+        print(f"→ Baseline written: {args.output}")
@@ -0,0 +1,180 @@
+import os
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from singleton import process_wide
+from sqlite_store import SQLiteStore
+
+
+# ==============================
+# Configuration
+# ==============================
+
+COST_LEDGER_PATH = os.getenv("COST_LEDGER_PATH", "exports/.cost_ledger.sqlite3")
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+# Unknown models are priced like the most expensive one above
+FALLBACK_PRICES = max(MODEL_PRICES.values(), key=lambda p: p[2])
+
+# The Batch API bills half the synchronous price
+BATCH_DISCOUNT = 0.5
+
+
+def call_cost(model: str, prompt_tokens: int, cached_tokens: int,
+              completion_tokens: int, batch: bool = False) -> float:
+    """Cost in USD of one call (cached tokens are part of prompt_tokens)."""
+    input_price, cached_price, output_price = MODEL_PRICES.get(model, FALLBACK_PRICES)
+    cost = (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+# ==============================
+# Job / stage attribution
+# ==============================
+
+_context = threading.local()
+
+
+@contextmanager
+def usage_context(record_id: str, stage: str):
+    """LLM usage recorded on this thread inside the block is charged to record_id / stage."""
+    previous = getattr(_context, "value", None)
+    _context.value = (record_id, stage)
+    try:
+        yield
+    finally:
+        _context.value = previous
+
+
+def current_context() -> tuple:
+    return getattr(_context, "value", None) or (None, None)
+
+
+# ==============================
+# Ledger
+# ==============================
+
+class CostLedger(SQLiteStore):
+    """
+    Token and cost ledger: one SQLite row per LLM call, tagged with the
+    run, the Airtable record and the stage (cv / letter). Totals for the
+    current run are also kept in memory for budget checks.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            ts REAL NOT NULL,
+            run_id TEXT NOT NULL,
+            record_id TEXT,
+            stage TEXT,
+            model TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            cached_tokens INTEGER NOT NULL,
+            completion_tokens INTEGER NOT NULL,
+            cost_usd REAL NOT NULL,
+            estimated INTEGER NOT NULL,
+            batch INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_llm_calls_record ON llm_calls(record_id)",
+    )
+
+    def __init__(self, path: str = COST_LEDGER_PATH):
+        super().__init__(path)
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+        self.max_cost = None
+        self.max_tokens = None
+
+        self._run_cost = 0.0
+        self._run_tokens = 0
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, prompt_tokens: int, cached_tokens: int,
+               completion_tokens: int, estimated: bool = False, batch: bool = False) -> float:
+        """Add one call, charged to the current usage_context(); returns its cost."""
+        record_id, stage = current_context()
+        cost = call_cost(model, prompt_tokens, cached_tokens, completion_tokens, batch=batch)
+        tokens = prompt_tokens + completion_tokens
+
+        with self._lock:
+            self._run_cost += cost
+            self._run_tokens += tokens
+            if record_id is not None:
+                job = self._jobs.setdefault(record_id, {"cost_usd": 0.0, "tokens": 0})
+                job["cost_usd"] += cost
+                job["tokens"] += tokens
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_calls (ts, run_id, record_id, stage, model, prompt_tokens,
+                                       cached_tokens, completion_tokens, cost_usd, estimated, batch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (time.time(), self.run_id, record_id, stage, model, prompt_tokens,
+                 cached_tokens, completion_tokens, cost, int(estimated), int(batch)),
+            )
+        return cost
+
+    # ---------- Totals ----------
+
+    def run_totals(self) -> dict:
+        with self._lock:
+            return {"cost_usd": self._run_cost, "tokens": self._run_tokens}
+
+    def job_totals(self, record_id: str) -> dict:
+        """Cost and tokens of one job in this run."""
+        with self._lock:
+            return dict(self._jobs.get(record_id, {"cost_usd": 0.0, "tokens": 0}))
+
+    def stage_totals(self, since: float = 0.0) -> dict:
+        """
+        stage -> {cost_usd, tokens, calls} for this run, from the ledger;
+        `since` (timestamp) keeps only the calls made from then on.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT COALESCE(stage, '-'), SUM(cost_usd),
+                       SUM(prompt_tokens + completion_tokens), COUNT(*)
+                FROM llm_calls WHERE run_id = ? AND ts >= ? GROUP BY stage
+                """,
+                (self.run_id, since),
+            ).fetchall()
+        return {stage: {"cost_usd": cost, "tokens": tokens, "calls": calls}
+                for stage, cost, tokens, calls in rows}
+
+    # ---------- Budget ----------
+
+    def set_budget(self, max_cost: float | None = None, max_tokens: int | None = None):
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+
+    def budget_reached(self) -> bool:
+        totals = self.run_totals()
+        return (
+            (self.max_cost is not None and totals["cost_usd"] >= self.max_cost)
+            or (self.max_tokens is not None and totals["tokens"] >= self.max_tokens)
+        )
+
+
+@process_wide
+def get_ledger() -> CostLedger:
+    """Return the process-wide ledger (created on first use)."""
+    return CostLedger()
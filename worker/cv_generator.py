@@ -1,22 +1,22 @@
-import os
-from dotenv import load_dotenv
-from openai import OpenAI
+from llm_dispatcher import get_dispatcher
+from stream_cleaner import CV_STOP_MARKERS, CV_SKIP_LINES
 
-def generate_custom_cv(cv_default_text, job_context):
-    """
-    Generate a tailored CV based on a default CV and a job context.
-    The default CV is the ONLY source of truth for personal information.
-    """
 
-    # Load env
-    #load_dotenv(dotenv_path="worker/.env")
-    load_dotenv(dotenv_path=".env")
+CV_TEMPERATURE = 0.2
+
+SYSTEM_PROMPT = (
+    "You generate professional CVs. "
+    "You strictly follow instructions and never add inferred or missing information."
+)
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set or not loaded.")
 
-    client = OpenAI(api_key=api_key)
+def build_cv_messages(cv_default_text, job_context):
+    """
+    Build the chat messages for the CV generation.
+    Static instructions and the default CV come first and the job context
+    last, so the long prefix is identical for every job and can be served
+    from OpenAI's prompt cache.
+    """
 
     prompt = f"""
 You are a professional career advisor.
@@ -43,29 +43,32 @@ STRICT RULES (must be followed):
 - Do NOT add comments, explanations, or metadata
 - Do not forget the diploma along with specializatoin
 
-JOB CONTEXT:
-{job_context}
-
 DEFAULT CV:
 {cv_default_text}
 
+JOB CONTEXT:
+{job_context}
+
 OUTPUT:
 Tailored CV in Markdown.
 """
 
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_custom_cv(cv_default_text, job_context):
+    """
+    Generate a tailored CV based on a default CV and a job context.
+    The default CV is the ONLY source of truth for personal information.
+    """
+
+    return get_dispatcher().complete(
         model="gpt-4.1-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You generate professional CVs. "
-                    "You strictly follow instructions and never add inferred or missing information."
-                ),
-            },
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2
+        messages=build_cv_messages(cv_default_text, job_context),
+        temperature=CV_TEMPERATURE,
+        stop_markers=CV_STOP_MARKERS,
+        skip_lines=CV_SKIP_LINES,
     )
-
-    return response.choices[0].message.content.strip()
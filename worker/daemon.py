@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Poll interval: back to the minimum as soon as a poll finds work, doubled
+# after each idle poll up to the maximum.
+DAEMON_MIN_INTERVAL = float(os.getenv("DAEMON_MIN_INTERVAL", "5"))
+DAEMON_MAX_INTERVAL = float(os.getenv("DAEMON_MAX_INTERVAL", "300"))
+
+# Wake endpoint (POST /wake): local only by default; set a token to
+# require "Authorization: Bearer <token>" if it is exposed further.
+DAEMON_WAKE_HOST = os.getenv("DAEMON_WAKE_HOST", "127.0.0.1")
+DAEMON_WAKE_PORT = int(os.getenv("DAEMON_WAKE_PORT", "8090"))
+DAEMON_WAKE_TOKEN = os.getenv("DAEMON_WAKE_TOKEN", "")
+
+
+# ==============================
+# Poll loop
+# ==============================
+
+class Daemon:
+    """
+    Calls `run_once()` (returns the number of jobs it processed) in a loop,
+    with an adaptive sleep in between. wake() cuts the current sleep short;
+    stop() ends the loop once the current run is over.
+    """
+
+    def __init__(self, run_once, min_interval: float = DAEMON_MIN_INTERVAL,
+                 max_interval: float = DAEMON_MAX_INTERVAL):
+        self.run_once = run_once
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+
+        self.runs = 0
+        self.jobs = 0
+        self.wakeups = 0
+        self.last_run = None
+        self.state = "starting"
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def wake(self):
+        self.wakeups += 1
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def next_interval(self, processed: int) -> float:
+        if processed:
+            return self.min_interval
+        return min(self.interval * 2, self.max_interval)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "runs": self.runs,
+            "jobs": self.jobs,
+            "wakeups": self.wakeups,
+            "interval_s": self.interval,
+            "last_run": self.last_run,
+        }
+
+    def run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.state = "running"
+            try:
+                processed = self.run_once() or 0
+            except Exception as e:
+                # Airtable / network errors: keep the daemon alive, retry later
+                print(f"⚠️ Poll failed: {e}")
+                processed = 0
+
+            self.runs += 1
+            self.jobs += processed
+            self.last_run = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.interval = self.next_interval(processed)
+
+            if self._stop.is_set():
+                break
+
+            self.state = "sleeping"
+            if processed:
+                # Jobs may have arrived while this run was busy
+                continue
+            if self._wake.wait(self.interval) and not self._stop.is_set():
+                print("→ Woken up")
+                self.interval = self.min_interval
+
+        self.state = "stopped"
+
+    def install_signal_handlers(self):
+        """SIGTERM / SIGINT finish the current run, then exit (main thread only)."""
+        def handle(signum, frame):
+            print("→ Stopping after the current run…")
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handle)
+        signal.signal(signal.SIGINT, handle)
+
+
+# ==============================
+# Wake endpoint
+# ==============================
+
+def make_handler(daemon: Daemon, token: str):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self) -> bool:
+            return not token or self.headers.get("Authorization", "") == f"Bearer {token}"
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {"error": "not found"})
+            return self._send(200, daemon.status())
+
+        def do_POST(self):
+            # Webhook payloads are ignored: any call means "poll now"
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path != "/wake":
+                return self._send(404, {"error": "not found"})
+            if not self._authorized():
+                return self._send(401, {"error": "unauthorized"})
+            daemon.wake()
+            return self._send(202, {"status": "woken"})
+
+    return Handler
+
+
+def start_wake_server(daemon: Daemon, host: str = DAEMON_WAKE_HOST, port: int = DAEMON_WAKE_PORT,
+                      token: str = DAEMON_WAKE_TOKEN) -> ThreadingHTTPServer:
+    """Serve POST /wake and GET /health in a background thread."""
+    server = ThreadingHTTPServer((host, port), make_handler(daemon, token))
+    threading.Thread(target=server.serve_forever, name="daemon-wake", daemon=True).start()
+    return server
@@ -0,0 +1,315 @@
+"""
+Local stand-in for the Airtable REST API (one or more tables, in memory).
+
+Point the worker at it with:
+    AIRTABLE_API_URL=http://127.0.0.1:8082/v0
+    AIRTABLE_API_KEY=test
+
+Behaves like Airtable where the worker depends on it: pageSize / offset
+pagination, fields[] selection, {Field}='value' and
+IS_AFTER(LAST_MODIFIED_TIME(), '...') formulas, multi-record
+PATCH of at most 10 records, and 429 answers above `max_rps` requests per
+second and per base.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MAX_PAGE_SIZE = 100
+MAX_RECORDS_PER_REQUEST = 10
+
+FORMULA_RE = re.compile(r"^\{([^}]+)\}\s*=\s*'([^']*)'$")
+MODIFIED_AFTER_RE = re.compile(r"^IS_AFTER\(\s*LAST_MODIFIED_TIME\(\)\s*,\s*'([^']*)'\s*\)$")
+
+
+# ==============================
+# State
+# ==============================
+
+class FakeAirtableState:
+    def __init__(self, max_rps: float = 5.0, retry_after: int = 1):
+        self.tables = {}
+        self.lock = threading.Lock()
+
+        # Open list iterations: offset token -> (remaining record ids)
+        self.iterations = {}
+
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self._recent = {}
+
+        # record id -> {status: time.time() when the Status was set}
+        self.status_times = {}
+        # record id -> time.time() of the last write (LAST_MODIFIED_TIME())
+        self.modified = {}
+
+        self.requests = 0
+        self.rate_limited = 0
+
+    def table(self, base_id: str, table_name: str) -> dict:
+        return self.tables.setdefault((base_id, table_name), {})
+
+    def allow(self, base_id: str) -> bool:
+        """Sliding one-second window per base, like Airtable's 5 req/s."""
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            recent = self._recent.setdefault(base_id, deque())
+            while recent and now - recent[0] >= 1:
+                recent.popleft()
+            if len(recent) >= self.max_rps:
+                self.rate_limited += 1
+                return False
+            recent.append(now)
+            return True
+
+    def create(self, base_id: str, table_name: str, fields: dict) -> dict:
+        record = {
+            "id": f"rec{uuid.uuid4().hex[:14]}",
+            "createdTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "fields": dict(fields),
+        }
+        with self.lock:
+            self.table(base_id, table_name)[record["id"]] = record
+            self._track(record["id"], fields)
+        return record
+
+    def update(self, base_id: str, table_name: str, record_id: str, fields: dict) -> dict | None:
+        with self.lock:
+            record = self.table(base_id, table_name).get(record_id)
+            if record is None:
+                return None
+            record["fields"].update(fields)
+            self._track(record_id, fields)
+            return record
+
+    def _track(self, record_id: str, fields: dict):
+        self.modified[record_id] = time.time()
+        if "Status" in fields:
+            self.status_times.setdefault(record_id, {})[fields["Status"]] = time.time()
+
+    def seed_waiting_jobs(self, base_id: str, table_name: str, count: int) -> list:
+        """Create `count` jobs with Status = 'waiting'; returns their ids."""
+        return [
+            self.create(base_id, table_name, {
+                "title": f"Ingénieur procédés {i} (H/F)",
+                "Source": "Load test",
+                "URL": f"https://example.com/offres/{i}",
+                "Status": "waiting",
+            })["id"]
+            for i in range(count)
+        ]
+
+    def list_page(self, base_id: str, table_name: str, query: dict):
+        """One page of records, like GET /v0/{base}/{table}."""
+        page_size = min(int(query.get("pageSize", [MAX_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        offset = query.get("offset", [None])[0]
+
+        with self.lock:
+            if offset:
+                # Airtable offsets point into the original iteration
+                ids = self.iterations.pop(offset, None)
+                if ids is None:
+                    raise ValueError("LIST_RECORDS_ITERATOR_NOT_AVAILABLE")
+            else:
+                ids = [
+                    record_id
+                    for record_id, record in self.table(base_id, table_name).items()
+                    if matches(
+                        record["fields"], query.get("filterByFormula", [""])[0],
+                        self.modified.get(record_id, 0),
+                    )
+                ]
+
+            page, rest = ids[:page_size], ids[page_size:]
+            records = self.table(base_id, table_name)
+            wanted = query.get("fields[]")
+
+            result = {"records": [
+                {
+                    "id": record_id,
+                    "createdTime": records[record_id]["createdTime"],
+                    "fields": {
+                        k: v for k, v in records[record_id]["fields"].items()
+                        if wanted is None or k in wanted
+                    },
+                }
+                for record_id in page if record_id in records
+            ]}
+
+            if rest:
+                token = f"itr{uuid.uuid4().hex[:14]}/{page[-1]}"
+                self.iterations[token] = rest
+                result["offset"] = token
+
+        return result
+
+
+def matches(fields: dict, formula: str, modified: float = 0) -> bool:
+    if not formula:
+        return True
+
+    match = MODIFIED_AFTER_RE.match(formula.strip())
+    if match:
+        after = datetime.fromisoformat(match.group(1).replace("Z", "+00:00"))
+        return modified > after.timestamp()
+
+    match = FORMULA_RE.match(formula.strip())
+    if not match:
+        raise ValueError(f"Unsupported formula: {formula}")
+    return str(fields.get(match.group(1), "")) == match.group(2)
+
+
+# ==============================
+# Server
+# ==============================
+
+def make_handler(state: FakeAirtableState):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload: dict, headers: dict | None = None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, error_type: str, message: str, headers: dict | None = None):
+            self._send(status, {"error": {"type": error_type, "message": message}}, headers)
+
+        def _body(self) -> dict:
+            return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        def _route(self):
+            """(base_id, table_name, record_id | None, query) or None after an error."""
+            url = urlparse(self.path)
+            match = re.fullmatch(r"/v0/([^/]+)/([^/]+)(?:/(rec\w+))?", url.path)
+            if not match:
+                self._error(404, "NOT_FOUND", f"Unknown path {url.path}")
+                return None
+
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                self._error(401, "AUTHENTICATION_REQUIRED", "Authentication required")
+                return None
+
+            base_id, table_name, record_id = match.group(1), unquote(match.group(2)), match.group(3)
+            if not state.allow(base_id):
+                self._error(
+                    429, "RATE_LIMIT_REACHED",
+                    "Rate limit exceeded. Please try again later",
+                    {"Retry-After": str(state.retry_after)},
+                )
+                return None
+
+            return base_id, table_name, record_id, parse_qs(url.query)
+
+        def do_GET(self):
+            route = self._route()
+            if route is None:
+                return
+            base_id, table_name, record_id, query = route
+
+            if record_id:
+                with state.lock:
+                    record = state.table(base_id, table_name).get(record_id)
+                if record is None:
+                    return self._error(404, "MODEL_ID_NOT_FOUND", "Record not found")
+                return self._send(200, record)
+
+            try:
+                return self._send(200, state.list_page(base_id, table_name, query))
+            except ValueError as e:
+                return self._error(422, "INVALID_REQUEST", str(e))
+
+        def do_PATCH(self):
+            route = self._route()
+            if route is None:
+                return
+            base_id, table_name, record_id, _ = route
+            body = self._body()
+
+            if record_id:
+                items = [{"id": record_id, "fields": body.get("fields", {})}]
+            else:
+                items = body.get("records", [])
+                if len(items) > MAX_RECORDS_PER_REQUEST:
+                    return self._error(
+                        422, "INVALID_RECORDS",
+                        f"At most {MAX_RECORDS_PER_REQUEST} records per request",
+                    )
+
+            updated = []
+            for item in items:
+                record = state.update(base_id, table_name, item["id"], item.get("fields", {}))
+                if record is None:
+                    return self._error(404, "MODEL_ID_NOT_FOUND", f"Record not found: {item['id']}")
+                updated.append(record)
+
+            return self._send(200, updated[0] if record_id else {"records": updated})
+
+        def do_POST(self):
+            route = self._route()
+            if route is None:
+                return
+            base_id, table_name, _, _ = route
+
+            items = self._body().get("records", [])
+            if len(items) > MAX_RECORDS_PER_REQUEST:
+                return self._error(
+                    422, "INVALID_RECORDS",
+                    f"At most {MAX_RECORDS_PER_REQUEST} records per request",
+                )
+
+            created = [state.create(base_id, table_name, item.get("fields", {})) for item in items]
+            return self._send(200, {"records": created})
+
+    return Handler
+
+
+def start_fake_airtable(host: str = "127.0.0.1", port: int = 0, max_rps: float = 5.0):
+    """
+    Start the server in a background thread; returns (server, api_url).
+    The tables and status timestamps are available on `server.state`.
+    """
+    state = FakeAirtableState(max_rps=max_rps)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v0"
+
+
+if __name__ == "__main__":
+    server, api_url = start_fake_airtable(
+        port=8082,
+        max_rps=float(os.getenv("FAKE_AIRTABLE_MAX_RPS", "5")),
+    )
+
+    seed = int(os.getenv("FAKE_AIRTABLE_SEED_JOBS", "0"))
+    if seed:
+        server.state.seed_waiting_jobs(
+            os.getenv("AIRTABLE_BASE_ID", "appTest"),
+            os.getenv("AIRTABLE_TABLE_NAME", "Jobs"),
+            seed,
+        )
+
+    print(f"Fake Airtable listening on {api_url} ({seed} waiting job(s))")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,318 @@
+"""
+Local stand-in for the France Travail OAuth2 token endpoint and the
+Offres d'emploi v2 search API, over a deterministic catalog of offers.
+
+Point fetch_francetravail at it with:
+    FRANCE_TRAVAIL_TOKEN_URL=http://127.0.0.1:8083/connexion/oauth2/access_token
+    FRANCE_TRAVAIL_SEARCH_URL=http://127.0.0.1:8083/partenaire/offresdemploi/v2/offres/search
+    FRANCE_TRAVAIL_CLIENT_ID=test
+    FRANCE_TRAVAIL_CLIENT_SECRET=test
+
+Search follows the real API where callers depend on it: `range=p-d` of
+at most 150 offers (p <= 3000, d <= 3149), 206 + Content-Range for partial
+results, 204 when nothing matches, motsCles / typeContrat / commune /
+minCreationDate + maxCreationDate filters, and 429 above `max_rps`.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import random
+import threading
+import unicodedata
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+TOKEN_PATH = "/connexion/oauth2/access_token"
+SEARCH_PATH = "/partenaire/offresdemploi/v2/offres/search"
+
+MAX_RANGE_SIZE = 150
+MAX_RANGE_START = 3000
+MAX_RANGE_END = 3149
+
+TITLES = [
+    "Ingénieur chimiste",
+    "Ingénieur procédés",
+    "Technicien de laboratoire",
+    "Responsable qualité",
+    "Chargé de R&D formulation",
+    "Ingénieur production",
+]
+CONTRACT_TYPES = ["CDI", "CDD", "MIS"]
+COMMUNES = [
+    ("75056", "75 - Paris"),
+    ("69123", "69 - Lyon"),
+    ("13055", "13 - Marseille"),
+    ("31555", "31 - Toulouse"),
+    ("67482", "67 - Strasbourg"),
+]
+
+
+# ==============================
+# Catalog
+# ==============================
+
+def fold(text: str) -> str:
+    """Lowercase without accents, for keyword matching."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def make_offer(rng: random.Random, number: int, created: datetime) -> dict:
+    offer_id = f"{100000 + number:06d}X"
+    title = rng.choice(TITLES)
+    code, label = rng.choice(COMMUNES)
+    updated = created + timedelta(hours=rng.randint(0, 48))
+
+    return {
+        "id": offer_id,
+        "intitule": f"{title} (H/F)",
+        "description": f"{title} au sein d'une équipe de {rng.randint(3, 40)} personnes.",
+        "dateCreation": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "dateActualisation": updated.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "lieuTravail": {"libelle": label, "commune": code},
+        "entreprise": {"nom": f"Entreprise {rng.randint(1, 200)}"},
+        "typeContrat": rng.choice(CONTRACT_TYPES),
+        "origineOffre": {
+            "origine": "1",
+            "urlOrigine": f"https://candidat.francetravail.fr/offres/recherche/detail/{offer_id}",
+        },
+    }
+
+
+def build_catalog(count: int = 1000, days: int = 30, seed: int = 0) -> list:
+    """`count` offers created over the last `days` days, newest first."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    offers = [
+        make_offer(rng, i, now - timedelta(seconds=rng.randint(0, days * 86400)))
+        for i in range(count)
+    ]
+    offers.sort(key=lambda o: (o["dateCreation"], o["id"]), reverse=True)
+    return offers
+
+
+def parse_date(value: str) -> datetime:
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+# ==============================
+# State
+# ==============================
+
+class FakeFranceTravailState:
+    def __init__(self, catalog: list, max_rps: float = 10.0, token_ttl: int = 1499,
+                 latency: float = 0.0):
+        self.catalog = catalog
+        self.lock = threading.Lock()
+
+        self.token_ttl = token_ttl
+        self.tokens = {}
+
+        self.max_rps = max_rps
+        self.latency = latency
+        self._recent = deque()
+
+        self.token_requests = 0
+        self.search_requests = 0
+        self.rate_limited = 0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            while self._recent and now - self._recent[0] >= 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rps:
+                self.rate_limited += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def issue_token(self) -> dict:
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.token_requests += 1
+            self.tokens[token] = time.monotonic() + self.token_ttl
+        return {
+            "scope": "api_offresdemploiv2 o2dsoffre",
+            "expires_in": self.token_ttl,
+            "token_type": "Bearer",
+            "access_token": token,
+        }
+
+    def token_valid(self, token: str) -> bool:
+        with self.lock:
+            expires_at = self.tokens.get(token)
+        return expires_at is not None and time.monotonic() < expires_at
+
+    def publish(self, count: int, seed: int | None = None) -> list:
+        """Add `count` offers created now (newest first); returns them."""
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        with self.lock:
+            start = len(self.catalog)
+            offers = [make_offer(rng, start + i, now) for i in range(count)]
+            self.catalog[:0] = offers
+        return offers
+
+    def search(self, query: dict) -> list:
+        """Offers matching the search filters, in a stable order."""
+        keywords = [fold(w) for w in re.split(r"[,\s]+", query.get("motsCles", [""])[0]) if w]
+        contracts = set(filter(None, query.get("typeContrat", [""])[0].split(",")))
+        communes = set(filter(None, query.get("commune", [""])[0].split(",")))
+
+        min_date = query.get("minCreationDate", [None])[0]
+        max_date = query.get("maxCreationDate", [None])[0]
+        if bool(min_date) != bool(max_date):
+            raise ValueError("Les paramètres minCreationDate et maxCreationDate doivent être renseignés ensemble")
+        if min_date:
+            min_date, max_date = parse_date(min_date), parse_date(max_date)
+
+        with self.lock:
+            self.search_requests += 1
+            catalog = list(self.catalog)
+
+        results = []
+        for offer in catalog:
+            text = fold(offer["intitule"] + " " + offer["description"])
+            if keywords and not all(k in text for k in keywords):
+                continue
+            if contracts and offer["typeContrat"] not in contracts:
+                continue
+            if communes and offer["lieuTravail"]["commune"] not in communes:
+                continue
+            if min_date and not (min_date <= parse_date(offer["dateCreation"]) <= max_date):
+                continue
+            results.append(offer)
+        return results
+
+
+def parse_range(value: str) -> tuple:
+    match = re.fullmatch(r"(\d+)-(\d+)", value)
+    if not match:
+        raise ValueError(f"Valeur du paramètre « range » incorrecte : {value}")
+
+    first, last = int(match.group(1)), int(match.group(2))
+    if first > last or last - first + 1 > MAX_RANGE_SIZE:
+        raise ValueError(f"La plage demandée est limitée à {MAX_RANGE_SIZE} offres")
+    if first > MAX_RANGE_START or last > MAX_RANGE_END:
+        raise ValueError(
+            f"La position de début doit être inférieure ou égale à {MAX_RANGE_START} "
+            f"et la position de fin à {MAX_RANGE_END}"
+        )
+    return first, last
+
+
+# ==============================
+# Server
+# ==============================
+
+def make_handler(state: FakeFranceTravailState):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload: dict | None, headers: dict | None = None):
+            body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            if payload is not None:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != TOKEN_PATH:
+                return self._send(404, {"message": f"Unknown path {url.path}"})
+
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+
+            if form.get("grant_type", [""])[0] != "client_credentials":
+                return self._send(400, {"error": "unsupported_grant_type"})
+            if not form.get("client_id") or not form.get("client_secret"):
+                return self._send(401, {
+                    "error": "invalid_client",
+                    "error_description": "Client authentication failed",
+                })
+
+            return self._send(200, state.issue_token())
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != SEARCH_PATH:
+                return self._send(404, {"message": f"Unknown path {url.path}"})
+
+            auth = self.headers.get("Authorization", "")
+            if not auth.startswith("Bearer ") or not state.token_valid(auth[len("Bearer "):]):
+                return self._send(401, {"message": "Invalid or expired token"})
+
+            if not state.allow():
+                return self._send(429, {"message": "Too Many Requests"}, {"Retry-After": "1"})
+
+            if state.latency > 0:
+                time.sleep(state.latency * random.uniform(0.5, 1.5))
+
+            query = parse_qs(url.query)
+            try:
+                first, last = parse_range(query.get("range", ["0-149"])[0])
+                results = state.search(query)
+            except ValueError as e:
+                return self._send(400, {"codeHttp": 400, "message": str(e)})
+
+            total = len(results)
+            if total == 0 or first >= total:
+                return self._send(204, None)
+
+            page = results[first:last + 1]
+            last = first + len(page) - 1
+            headers = {
+                "Content-Range": f"offres {first}-{last}/{total}",
+                "Accept-Range": f"offres {MAX_RANGE_SIZE}",
+            }
+            status = 200 if first == 0 and last == total - 1 else 206
+            return self._send(status, {"resultats": page}, headers)
+
+    return Handler
+
+
+def start_fake_francetravail(host: str = "127.0.0.1", port: int = 0, offers: int = 1000,
+                             max_rps: float = 10.0, token_ttl: int = 1499,
+                             latency: float = 0.0):
+    """
+    Start the server in a background thread; returns (server, base_url).
+    Token and search URLs are base_url + TOKEN_PATH / SEARCH_PATH; the
+    catalog and counters are available on `server.state`.
+    """
+    state = FakeFranceTravailState(
+        build_catalog(offers), max_rps=max_rps, token_ttl=token_ttl, latency=latency,
+    )
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, base_url = start_fake_francetravail(
+        port=8083,
+        offers=int(os.getenv("FAKE_FRANCE_TRAVAIL_OFFERS", "1000")),
+        max_rps=float(os.getenv("FAKE_FRANCE_TRAVAIL_MAX_RPS", "10")),
+    )
+    print(f"Fake France Travail listening on {base_url}")
+    print(f"FRANCE_TRAVAIL_TOKEN_URL={base_url}{TOKEN_PATH}")
+    print(f"FRANCE_TRAVAIL_SEARCH_URL={base_url}{SEARCH_PATH}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,261 @@
+"""
+Local stand-in for the OpenAI endpoints used by the worker:
+chat completions, files and batches.
+
+Point the worker at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8081/v1
+    OPENAI_API_KEY=test
+
+Chat completions can be slowed down and throttled to look like the real
+API under load (FAKE_OPENAI_LATENCY seconds, FAKE_OPENAI_429_RATE 0..1).
+"""
+
+import os
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ==============================
+# Canned generations
+# ==============================
+
+def fake_completion_text(messages: list) -> str:
+    """
+    Deterministic output that the PDF exporters accept:
+    the default CV for CV prompts (its header followed by the job title,
+    so each job gets its own PDF), a 5-block letter for letter prompts.
+    """
+    prompt = messages[-1]["content"]
+
+    if "DEFAULT CV:" in prompt:
+        cv = prompt.split("DEFAULT CV:", 1)[1].split("JOB CONTEXT:", 1)[0].strip()
+        job_title = re.search(r"Job title:\s*(.+)", prompt)
+        if job_title:
+            header, rest = (cv.split("\n", 1) + [""])[:2]
+            cv = f"{header} - {job_title.group(1).strip()}\n{rest}"
+        return "```markdown\n" + cv + "\n```"
+
+    first_line = re.search(r'FIRST LINE:\s*"([^"]+)"', prompt)
+    return "\n\n".join([
+        first_line.group(1) if first_line else "Paris, le 1 janvier 2025",
+        "Service Recrutement\nEntreprise",
+        "Objet : Candidature",
+        "Madame, Monsieur,\nJe vous propose ma candidature.",
+        "Cordialement,\nCandidat",
+    ])
+
+
+def fake_chat_completion(body: dict) -> dict:
+    text = fake_completion_text(body["messages"])
+    prompt_tokens = sum(len(m["content"]) // 4 for m in body["messages"])
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4.1-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(text) // 4,
+            "total_tokens": prompt_tokens + len(text) // 4,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+    }
+
+
+# ==============================
+# Server
+# ==============================
+
+class FakeOpenAIState:
+    def __init__(self, latency: float = 0.0, rate_limit_rate: float = 0.0):
+        self.files = {}
+        self.batches = {}
+        self.lock = threading.Lock()
+
+        # Mean response time (seconds, +/- 50%) and share of 429 answers
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.completions = 0
+        self.rate_limited = 0
+
+    def throttle(self) -> bool:
+        """True if this chat call should get a 429; otherwise waits `latency`."""
+        if random.random() < self.rate_limit_rate:
+            with self.lock:
+                self.rate_limited += 1
+            return True
+
+        if self.latency > 0:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        with self.lock:
+            self.completions += 1
+        return False
+
+    def run_batch(self, batch: dict):
+        """Process a batch input file into an output file."""
+        lines = []
+        for raw in self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines():
+            if not raw.strip():
+                continue
+            item = json.loads(raw)
+            lines.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": item["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": fake_chat_completion(item["body"]),
+                },
+                "error": None,
+            }))
+
+        output_id = self.add_file("\n".join(lines).encode("utf-8"), "batch_output")
+        batch.update(
+            status="completed",
+            output_file_id=output_id,
+            completed_at=int(time.time()),
+            request_counts={"total": len(lines), "completed": len(lines), "failed": 0},
+        )
+
+    def add_file(self, content: bytes, purpose: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl",
+            "purpose": purpose,
+            "content": content,
+        }
+        return file_id
+
+
+def make_handler(state: FakeOpenAIState):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload, raw: bool = False):
+            body = payload if raw else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream" if raw else "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_POST(self):
+            if self.path == "/v1/chat/completions":
+                body = json.loads(self._body())
+                if state.throttle():
+                    return self._send(429, {"error": {
+                        "message": "Rate limit reached for requests",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }})
+                return self._send(200, fake_chat_completion(body))
+
+            if self.path == "/v1/files":
+                # multipart/form-data: fields "purpose" and "file"
+                raw = self._body()
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                message = BytesParser(policy=HTTP).parsebytes(header + raw)
+                parts = {p.get_param("name", header="content-disposition"): p for p in message.iter_parts()}
+
+                with state.lock:
+                    file_id = state.add_file(
+                        parts["file"].get_payload(decode=True),
+                        parts["purpose"].get_content().strip(),
+                    )
+                    meta = {k: v for k, v in state.files[file_id].items() if k != "content"}
+                return self._send(200, meta)
+
+            if self.path == "/v1/batches":
+                body = json.loads(self._body())
+                batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+                batch = {
+                    "id": batch_id,
+                    "object": "batch",
+                    "endpoint": body["endpoint"],
+                    "input_file_id": body["input_file_id"],
+                    "completion_window": body["completion_window"],
+                    "status": "validating",
+                    "output_file_id": None,
+                    "error_file_id": None,
+                    "created_at": int(time.time()),
+                }
+                with state.lock:
+                    state.batches[batch_id] = batch
+                return self._send(200, batch)
+
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def do_GET(self):
+            match = re.fullmatch(r"/v1/batches/([\w-]+)", self.path)
+            if match:
+                with state.lock:
+                    batch = state.batches.get(match.group(1))
+                    if batch is None:
+                        return self._send(404, {"error": {"message": "No such batch"}})
+                    # One poll in progress, completed on the next one
+                    if batch["status"] == "validating":
+                        batch["status"] = "in_progress"
+                    elif batch["status"] == "in_progress":
+                        state.run_batch(batch)
+                    return self._send(200, batch)
+
+            match = re.fullmatch(r"/v1/files/([\w-]+)/content", self.path)
+            if match:
+                with state.lock:
+                    file = state.files.get(match.group(1))
+                if file is None:
+                    return self._send(404, {"error": {"message": "No such file"}})
+                return self._send(200, file["content"], raw=True)
+
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    return Handler
+
+
+def start_fake_openai(host: str = "127.0.0.1", port: int = 0,
+                      latency: float = 0.0, rate_limit_rate: float = 0.0):
+    """
+    Start the server in a background thread; returns (server, base_url).
+    Counters are available on `server.state`.
+    """
+    state = FakeOpenAIState(latency=latency, rate_limit_rate=rate_limit_rate)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    server, base_url = start_fake_openai(
+        port=8081,
+        latency=float(os.getenv("FAKE_OPENAI_LATENCY", "0")),
+        rate_limit_rate=float(os.getenv("FAKE_OPENAI_429_RATE", "0")),
+    )
+    print(f"Fake OpenAI listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
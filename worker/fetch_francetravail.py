@@ -1,25 +1,55 @@
 import os
-import requests
-from typing import List, Dict
+import re
+from typing import Iterator, List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from http_session import get_session
+from oauth_token import TokenProvider
+from rate_limit import RateLimiter
+from singleton import process_wide
 
 
 # ==============================
 # Configuration
 # ==============================
 
+# Both can be overridden to use a local stand-in (see fake_francetravail.py)
 #TOKEN_URL = "https://api.francetravail.io/connexion/oauth2/access_token"
-TOKEN_URL = "https://entreprise.francetravail.io/connexion/oauth2/access_token"
-SEARCH_URL = "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search"
+TOKEN_URL = os.getenv(
+    "FRANCE_TRAVAIL_TOKEN_URL",
+    "https://entreprise.francetravail.io/connexion/oauth2/access_token",
+)
+SEARCH_URL = os.getenv(
+    "FRANCE_TRAVAIL_SEARCH_URL",
+    "https://api.francetravail.io/partenaire/offresdemploi/v2/offres/search",
+)
+
+# Tokens are shared by all processes through this file (see oauth_token.py)
+TOKEN_CACHE_PATH = os.getenv("FRANCE_TRAVAIL_TOKEN_CACHE", "exports/.francetravail_token.json")
+
+# Offres d'emploi v2: at most 150 offers per `range`, and no offer beyond
+# position 3149 for a given search (narrow the search to get the rest)
+RANGE_SIZE = 150
+MAX_RANGE_END = 3149
+
+# Per-second quota of the search API, shared by all harvest threads
+FRANCE_TRAVAIL_MAX_RPS = float(os.getenv("FRANCE_TRAVAIL_MAX_RPS", "10"))
+FRANCE_TRAVAIL_LIMITER = RateLimiter(FRANCE_TRAVAIL_MAX_RPS)
+
+# Range windows fetched in parallel
+HARVEST_WORKERS = int(os.getenv("FRANCE_TRAVAIL_WORKERS", "4"))
+
+CONTENT_RANGE_RE = re.compile(r"(\d+)-(\d+)/(\d+)")
 
 
 # ==============================
 # Authentification
 # ==============================
 
-def get_france_travail_token() -> str:
+def request_france_travail_token() -> tuple:
     """
     Récupère un access_token OAuth2 via client_credentials
+    Retourne (access_token, expires_in)
     """
 
     load_dotenv()
@@ -30,7 +60,7 @@ def get_france_travail_token() -> str:
     if not client_id or not client_secret:
         raise RuntimeError("FRANCE_TRAVAIL_CLIENT_ID ou CLIENT_SECRET manquant")
 
-    response = requests.post(
+    response = get_session().post(
         TOKEN_URL,
         data={
             "grant_type": "client_credentials",
@@ -45,13 +75,49 @@ def get_france_travail_token() -> str:
     )
 
     response.raise_for_status()
-    return response.json()["access_token"]
+    data = response.json()
+    return data["access_token"], data.get("expires_in", 0)
+
+
+@process_wide
+def get_token_provider() -> TokenProvider:
+    """Return the process-wide token provider (created on first use)."""
+    load_dotenv()
+    return TokenProvider(
+        request_france_travail_token,
+        TOKEN_CACHE_PATH,
+        # One entry per account and endpoint
+        key=f"{TOKEN_URL}|{os.getenv('FRANCE_TRAVAIL_CLIENT_ID', '')}",
+    )
+
+
+def get_france_travail_token() -> str:
+    """
+    access_token valide (cache mémoire / disque, renouvelé avant expiration)
+    """
+    return get_token_provider().get()
 
 
 # ==============================
 # Fetch offres
 # ==============================
 
+def build_search_params(
+    keyword: str,
+    contract_type: str | None = None,
+    commune_insee: str | None = None
+) -> Dict:
+    params = {"motsCles": keyword}
+
+    if contract_type:
+        params["typeContrat"] = contract_type  # ex: CDI
+
+    if commune_insee:
+        params["commune"] = commune_insee  # code INSEE uniquement
+
+    return params
+
+
 def fetch_france_travail_offers(
     token: str,
     keyword: str,
@@ -68,17 +134,11 @@ def fetch_france_travail_offers(
     }
 
     params = {
-        "motsCles": keyword,
+        **build_search_params(keyword, contract_type, commune_insee),
         "range": f"0-{limit - 1}"
     }
 
-    if contract_type:
-        params["typeContrat"] = contract_type  # ex: CDI
-
-    if commune_insee:
-        params["commune"] = commune_insee  # code INSEE uniquement
-
-    response = requests.get(
+    response = get_session().get(
         SEARCH_URL,
         headers=headers,
         params=params,
@@ -90,6 +150,103 @@ def fetch_france_travail_offers(
     return data.get("resultats", [])
 
 
+# ==============================
+# Harvest (all pages)
+# ==============================
+
+def fetch_range(params: Dict, first: int, last: int) -> tuple:
+    """
+    One `range` window of a search: (offers, total).
+    total comes from Content-Range ("offres 0-149/1234"); 0 when nothing matches.
+    """
+    provider = get_token_provider()
+
+    for attempt in range(2):
+        token = provider.get()
+        FRANCE_TRAVAIL_LIMITER.acquire()
+        response = get_session().get(
+            SEARCH_URL,
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+            params={**params, "range": f"{first}-{last}"},
+            timeout=20
+        )
+        if response.status_code == 401 and attempt == 0:
+            # Token revoked or expired early: get a new one, once
+            provider.invalidate(token)
+            continue
+        break
+
+    response.raise_for_status()
+    if response.status_code == 204:
+        return [], 0
+
+    offers = response.json().get("resultats", [])
+    match = CONTENT_RANGE_RE.search(response.headers.get("Content-Range", ""))
+    total = int(match.group(3)) if match else first + len(offers)
+    return offers, total
+
+
+def harvest_raw_offers(
+    params: Dict,
+    max_offers: int | None = None,
+    workers: int = HARVEST_WORKERS
+) -> Iterator[Dict]:
+    """
+    Every raw offer of a search (search params without `range`), as a stream.
+
+    The first window gives the total (Content-Range); the remaining
+    150-offer windows are then fetched in parallel, within the shared
+    per-second quota. Offers are yielded as their window arrives, so the
+    order is not the API's.
+    """
+    limit = MAX_RANGE_END + 1 if max_offers is None else min(max_offers, MAX_RANGE_END + 1)
+    if limit <= 0:
+        return
+
+    offers, total = fetch_range(params, 0, min(RANGE_SIZE, limit) - 1)
+    yield from offers
+
+    if total > MAX_RANGE_END + 1 and (max_offers is None or max_offers > MAX_RANGE_END + 1):
+        print(
+            f"⚠️ {total} offres pour « {params.get('motsCles', '')} » : seules les "
+            f"{MAX_RANGE_END + 1} premières sont accessibles, affinez la recherche"
+        )
+
+    end = min(total, limit)
+    windows = [
+        (first, min(first + RANGE_SIZE, end) - 1)
+        for first in range(RANGE_SIZE, end, RANGE_SIZE)
+    ]
+    if not windows:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ft-harvest")
+    try:
+        futures = [pool.submit(fetch_range, params, first, last) for first, last in windows]
+        for future in as_completed(futures):
+            offers, _ = future.result()
+            yield from offers
+    finally:
+        # Stops queued windows if the caller stops reading early
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def harvest_france_travail_offers(
+    keyword: str,
+    contract_type: str | None = None,
+    commune_insee: str | None = None,
+    max_offers: int | None = None,
+    workers: int = HARVEST_WORKERS,
+    extra_params: Dict | None = None
+) -> Iterator[Dict]:
+    """
+    Toutes les offres d'une recherche, normalisées, au fil de l'eau
+    """
+    params = {**build_search_params(keyword, contract_type, commune_insee), **(extra_params or {})}
+    for offer in harvest_raw_offers(params, max_offers=max_offers, workers=workers):
+        yield normalize_offer(offer)
+
+
 # ==============================
 # Normalisation (Airtable-ready)
 # ==============================
@@ -99,6 +256,7 @@ def normalize_offer(raw_offer: Dict) -> Dict:
     Normalise une offre France Travail vers le schéma minimal Airtable
     """
     return {
+        "id": raw_offer.get("id"),
         "title": raw_offer.get("intitule"),
         "url": raw_offer.get("origineOffre", {}).get("urlOrigine"),
         "source": "France Travail"
@@ -127,3 +285,7 @@ if __name__ == "__main__":
         print("—")
         print("Title :", clean["title"])
         print("URL   :", clean["url"])
+
+    print("\n→ Test harvest France Travail (toutes les pages)")
+    harvested = list(harvest_france_travail_offers("ingénieur chimiste", contract_type="CDI"))
+    print(f"{len(harvested)} offre(s) récupérée(s)")
@@ -1,9 +1,15 @@
-import requests
+import os
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse, parse_qs
+from http_session import get_session
+from rate_limit import RateLimiter
 
 BASE_URL = "https://fr.indeed.com"
 
+# Result pages per second, shared by all threads (light scraping only)
+INDEED_MAX_RPS = float(os.getenv("INDEED_MAX_RPS", "0.5"))
+INDEED_LIMITER = RateLimiter(INDEED_MAX_RPS)
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; GenAI-Jobs/1.0)"
 }
@@ -20,7 +26,8 @@ def fetch_indeed_jobs(query: str, location: str = "", limit: int = 10):
             "start": start
         }
 
-        r = requests.get(
+        INDEED_LIMITER.acquire()
+        r = get_session().get(
             f"{BASE_URL}/jobs",
             params=params,
             headers=HEADERS,
@@ -47,6 +54,8 @@ def fetch_indeed_jobs(query: str, location: str = "", limit: int = 10):
             url = urljoin(BASE_URL, href)
 
             jobs.append({
+                # Indeed job key (jk=...), stable across searches
+                "id": parse_qs(urlparse(url).query).get("jk", [url])[0],
                 "title": title,
                 "url": url,
                 "source": "Indeed"
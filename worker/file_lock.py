@@ -0,0 +1,23 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, callers' thread locks still apply
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock shared by all processes, on `<path>.lock`."""
+    if fcntl is None:
+        yield
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+from typing import Iterator, Dict
+from datetime import datetime, timedelta, timezone
+from fetch_francetravail import (
+    build_search_params,
+    harvest_raw_offers,
+    normalize_offer,
+    HARVEST_WORKERS,
+)
+from singleton import process_wide
+from sqlite_store import SQLiteStore
+
+
+# ==============================
+# Configuration
+# ==============================
+
+FRANCE_TRAVAIL_SYNC_PATH = os.getenv(
+    "FRANCE_TRAVAIL_SYNC_PATH", "exports/.francetravail_sync.sqlite3"
+)
+
+# Offers created this long before the watermark are asked for again
+# (publication delays, clock differences)
+SYNC_OVERLAP_HOURS = float(os.getenv("FRANCE_TRAVAIL_SYNC_OVERLAP_HOURS", "2"))
+
+# The date filter only sees new offers; a full scan this often also
+# catches offers updated since they were first seen (dateActualisation)
+FULL_SCAN_DAYS = float(os.getenv("FRANCE_TRAVAIL_FULL_SCAN_DAYS", "7"))
+
+# Seen offer ids not returned again for this long are forgotten
+SEEN_RETENTION_DAYS = float(os.getenv("FRANCE_TRAVAIL_SEEN_RETENTION_DAYS", "90"))
+
+
+def parse_api_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def api_date(moment: datetime) -> str:
+    """minCreationDate / maxCreationDate format (UTC, seconds)."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def query_key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+
+# ==============================
+# Sync state
+# ==============================
+
+class OfferSyncState(SQLiteStore):
+    """
+    Per-query watermark (latest dateCreation seen, last full scan) and the
+    ids of offers already returned, with their dateActualisation.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS watermarks (
+            query_key TEXT PRIMARY KEY,
+            last_creation TEXT,
+            last_full_scan REAL NOT NULL,
+            last_sync REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS seen_offers (
+            query_key TEXT NOT NULL,
+            offer_id TEXT NOT NULL,
+            date_actualisation TEXT,
+            seen_at REAL NOT NULL,
+            PRIMARY KEY (query_key, offer_id)
+        )
+        """,
+    )
+
+    def __init__(self, path: str = FRANCE_TRAVAIL_SYNC_PATH):
+        super().__init__(path)
+
+    def watermark(self, key: str) -> tuple:
+        """(last_creation | None, last_full_scan timestamp)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT last_creation, last_full_scan FROM watermarks WHERE query_key = ?", (key,)
+            ).fetchone()
+        return row if row else (None, 0.0)
+
+    def seen(self, key: str) -> dict:
+        """offer id -> dateActualisation for this query."""
+        with self._connect() as conn:
+            return dict(conn.execute(
+                "SELECT offer_id, date_actualisation FROM seen_offers WHERE query_key = ?", (key,)
+            ).fetchall())
+
+    def commit(self, key: str, last_creation: str | None, full_scan: bool, offers: list):
+        """Store the new watermark and the offers the API returned, in one transaction."""
+        now = time.time()
+        with self._connect() as conn:
+            previous = conn.execute(
+                "SELECT last_full_scan FROM watermarks WHERE query_key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO watermarks (query_key, last_creation, last_full_scan, last_sync)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, last_creation, now if full_scan else (previous[0] if previous else 0.0), now),
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO seen_offers (query_key, offer_id, date_actualisation, seen_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(key, o["id"], o.get("dateActualisation"), now) for o in offers],
+            )
+            conn.execute(
+                "DELETE FROM seen_offers WHERE seen_at < ?", (now - SEEN_RETENTION_DAYS * 86400,)
+            )
+
+
+@process_wide
+def get_sync_state() -> OfferSyncState:
+    """Return the process-wide sync state (created on first use)."""
+    return OfferSyncState()
+
+
+# ==============================
+# Incremental sync
+# ==============================
+
+def sync_france_travail_offers(
+    keyword: str,
+    contract_type: str | None = None,
+    commune_insee: str | None = None,
+    full: bool = False,
+    workers: int = HARVEST_WORKERS
+) -> Iterator[Dict]:
+    """
+    Offres nouvelles ou mises à jour depuis la dernière synchro, normalisées.
+
+    After the first run only offers created since the watermark are
+    requested (minCreationDate / maxCreationDate), and offers already
+    returned with the same dateActualisation are skipped. The watermark is
+    saved once the stream is fully read, so an interrupted run is redone.
+    """
+    state = get_sync_state()
+    params = build_search_params(keyword, contract_type, commune_insee)
+    key = query_key(params)
+
+    last_creation, last_full_scan = state.watermark(key)
+    if last_creation is None or time.time() - last_full_scan > FULL_SCAN_DAYS * 86400:
+        full = True
+
+    if not full:
+        since = parse_api_date(last_creation) - timedelta(hours=SYNC_OVERLAP_HOURS)
+        # The API wants both bounds
+        params = {
+            **params,
+            "minCreationDate": api_date(since),
+            "maxCreationDate": api_date(datetime.now(timezone.utc)),
+        }
+
+    seen = state.seen(key)
+    newest = parse_api_date(last_creation) if last_creation else None
+    # Every offer the API returned, unchanged ones included (keeps them seen)
+    received = []
+
+    for offer in harvest_raw_offers(params, workers=workers):
+        created = offer.get("dateCreation")
+        if created and (newest is None or parse_api_date(created) > newest):
+            newest = parse_api_date(created)
+
+        received.append(offer)
+        offer_id = offer.get("id")
+        if offer_id in seen and seen[offer_id] == offer.get("dateActualisation"):
+            continue
+        seen[offer_id] = offer.get("dateActualisation")
+        yield normalize_offer(offer)
+
+    state.commit(key, api_date(newest) if newest else None, full, received)
@@ -0,0 +1,149 @@
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import get_metrics, RETRIES
+from singleton import process_wide
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Used when a call does not pass its own timeout (seconds)
+DEFAULT_TIMEOUT = 20
+
+# Keep-alive connections kept per host (roughly: max parallel requests)
+POOL_SIZES = {
+    "https://api.airtable.com": 10,
+    "https://api.francetravail.io": 10,
+    "https://entreprise.francetravail.io": 2,
+    "https://fr.indeed.com": 2,
+}
+DEFAULT_POOL_SIZE = 4
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+# ==============================
+# Session
+# ==============================
+
+class _TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every call."""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class _PacedRetry(Retry):
+    """
+    Retry that waits through a shared RateLimiter: a 429 pauses the limiter
+    for at least `throttle_backoff` seconds, so every thread backs off (not
+    only the one that was throttled), and retried requests take a token
+    like any other request instead of arriving in a burst.
+    """
+
+    limiter = None
+    throttle_backoff = 0.0
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.limiter = self.limiter
+        retry.throttle_backoff = self.throttle_backoff
+        return retry
+
+    def sleep(self, response=None):
+        if self.limiter is None:
+            return super().sleep(response)
+
+        if response is not None and response.status == 429:
+            wait = max(self.get_retry_after(response) or 0, self.throttle_backoff)
+            self.limiter.pause(wait)
+        else:
+            super().sleep(response)
+        self.limiter.acquire()
+
+
+def _retry_policy(retry_class=Retry) -> Retry:
+    # raise_on_status=False: once retries are exhausted the last response is
+    # returned, so callers keep using raise_for_status() as before.
+    return retry_class(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST", "PATCH", "PUT", "DELETE"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _count_retries(response, *args, **kwargs):
+    """Response hook: count the attempts urllib3 retried before this response."""
+    retries = getattr(response.raw, "retries", None)
+    for attempt in getattr(retries, "history", ()):
+        reason = str(attempt.status) if attempt.status else type(attempt.error).__name__
+        get_metrics().inc(RETRIES, service=urlparse(response.url).hostname, reason=reason)
+
+
+def _build_session(retries: bool = True) -> requests.Session:
+    session = _TimeoutSession(DEFAULT_TIMEOUT)
+    session.hooks["response"].append(_count_retries)
+
+    def max_retries():
+        return _retry_policy() if retries else 0
+
+    default_adapter = HTTPAdapter(
+        pool_maxsize=DEFAULT_POOL_SIZE,
+        max_retries=max_retries(),
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    # Longest prefix wins, so these override the defaults above
+    for prefix, size in POOL_SIZES.items():
+        session.mount(
+            prefix,
+            HTTPAdapter(pool_maxsize=size, max_retries=max_retries()),
+        )
+
+    return session
+
+
+def pace_host(base_url: str, limiter, throttle_backoff: float = 0.0):
+    """
+    Send the retries of requests to `base_url`'s host through `limiter`,
+    waiting at least `throttle_backoff` seconds after a 429.
+    """
+    url = urlparse(base_url)
+    origin = f"{url.scheme}://{url.netloc}"
+
+    retry = _retry_policy(_PacedRetry)
+    retry.limiter = limiter
+    retry.throttle_backoff = throttle_backoff
+
+    # Trailing "/": a prefix must not match another port on the same host
+    get_session().mount(
+        origin + "/",
+        HTTPAdapter(pool_maxsize=POOL_SIZES.get(origin, DEFAULT_POOL_SIZE), max_retries=retry),
+    )
+
+
+@process_wide
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session (created on first use)."""
+    return _build_session()
+
+
+@process_wide
+def get_single_attempt_session() -> requests.Session:
+    """
+    Pooled session that never retries (created on first use), for requests
+    that must not be sent late, like lease claims: callers handle 429s.
+    """
+    return _build_session(retries=False)
@@ -0,0 +1,158 @@
+import os
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from singleton import process_wide
+from sqlite_store import SQLiteStore
+
+
+# ==============================
+# Configuration
+# ==============================
+
+JOB_MIRROR_PATH = os.getenv("JOB_MIRROR_PATH", "exports/.jobs_mirror.sqlite3")
+
+# Records modified this long before the previous sync started are fetched
+# again, to absorb clock skew and writes in flight during that sync.
+SYNC_OVERLAP_SECONDS = float(os.getenv("JOB_MIRROR_OVERLAP", "60"))
+
+# Incremental syncs cannot see deleted records: a full scan reconciles them
+FULL_SYNC_HOURS = float(os.getenv("JOB_MIRROR_FULL_SYNC_HOURS", "24"))
+
+
+def airtable_time(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+# ==============================
+# Mirror
+# ==============================
+
+class JobMirror(SQLiteStore):
+    """
+    Local SQLite copy of the jobs table (only the fields the worker reads).
+
+    sync() asks Airtable only for records modified since the stored
+    watermark (LAST_MODIFIED_TIME()), so polling an idle table costs one
+    request; queue queries then run locally. Writes still go to Airtable
+    (AirtableWriter) and are applied here once sent.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            fields TEXT NOT NULL,
+            created_time TEXT,
+            synced_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_time)",
+        "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    )
+
+    def __init__(self, path: str = JOB_MIRROR_PATH, overlap: float = SYNC_OVERLAP_SECONDS,
+                 full_sync_hours: float = FULL_SYNC_HOURS):
+        super().__init__(path)
+        self.overlap = overlap
+        self.full_sync_hours = full_sync_hours
+
+    def _state(self, conn, key: str) -> str | None:
+        row = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _set_state(conn, key: str, value: str):
+        conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    # ---------- Sync ----------
+
+    def sync(self, fetch, full: bool = False) -> int:
+        """
+        Pull changes from Airtable. `fetch(formula)` yields records like
+        worker.fetch_jobs. Returns the number of records written.
+        A full scan is done on first use, every FULL_SYNC_HOURS, or on request.
+        """
+        started = datetime.now(timezone.utc)
+
+        with self._connect() as conn:
+            watermark = self._state(conn, "watermark")
+            last_full = float(self._state(conn, "last_full_sync") or 0)
+
+        if watermark is None or time.time() - last_full > self.full_sync_hours * 3600:
+            full = True
+
+        formula = "" if full else f"IS_AFTER(LAST_MODIFIED_TIME(), '{watermark}')"
+
+        seen = set()
+        rows = []
+        now = time.time()
+        for record in fetch(formula):
+            fields = record.get("fields", {})
+            seen.add(record["id"])
+            rows.append((
+                record["id"],
+                fields.get("Status"),
+                json.dumps(fields, ensure_ascii=False),
+                record.get("createdTime"),
+                now,
+            ))
+
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO jobs (id, status, fields, created_time, synced_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            if full:
+                # Records deleted in Airtable since the last full scan
+                known = [r[0] for r in conn.execute("SELECT id FROM jobs")]
+                conn.executemany(
+                    "DELETE FROM jobs WHERE id = ?", [(r,) for r in known if r not in seen],
+                )
+                self._set_state(conn, "last_full_sync", str(now))
+            self._set_state(
+                conn, "watermark", airtable_time(started - timedelta(seconds=self.overlap)),
+            )
+
+        return len(rows)
+
+    # ---------- Local writes ----------
+
+    def apply(self, record_id: str, fields: dict):
+        """Merge fields already sent to Airtable into the local copy."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT fields FROM jobs WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return
+            merged = {**json.loads(row[0]), **fields}
+            conn.execute(
+                "UPDATE jobs SET fields = ?, status = ? WHERE id = ?",
+                (json.dumps(merged, ensure_ascii=False), merged.get("Status"), record_id),
+            )
+
+    # ---------- Queries ----------
+
+    def jobs_with_status(self, *statuses: str) -> list:
+        """Records (Airtable shape: id, createdTime, fields), oldest first."""
+        placeholders = ",".join("?" for _ in statuses)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, created_time, fields FROM jobs WHERE status IN ({placeholders}) "
+                "ORDER BY created_time, id",
+                statuses,
+            ).fetchall()
+        return [{"id": r[0], "createdTime": r[1], "fields": json.loads(r[2])} for r in rows]
+
+    def status_counts(self) -> dict:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+@process_wide
+def get_job_mirror() -> JobMirror:
+    """Return the process-wide mirror (created on first use)."""
+    return JobMirror()
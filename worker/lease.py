@@ -0,0 +1,266 @@
+import os
+import time
+import uuid
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from http_session import get_session, get_single_attempt_session
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Leases need the three fields below in the table. Off by default: a claim
+# is then a plain Status=processing write, fine for a single worker.
+LEASES_ENABLED = os.getenv("LEASES", "0") == "1"
+
+# Identifies this process in the Airtable table (who holds a job)
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# A job whose lease is not renewed for this long can be reclaimed
+LEASE_TTL = float(os.getenv("LEASE_TTL", "300"))
+HEARTBEAT_SECONDS = float(os.getenv("LEASE_HEARTBEAT", str(LEASE_TTL / 3)))
+
+# Wait between writing a claim and reading it back: longer than the gap
+# between another worker's pre-check and its own claim write.
+CLAIM_SETTLE_SECONDS = float(os.getenv("LEASE_CLAIM_SETTLE", "1"))
+
+# A claim throttled (429) before its write landed is started over after
+# the limiter pause, at most this many times in all.
+CLAIM_ATTEMPTS = int(os.getenv("LEASE_CLAIM_ATTEMPTS", "3"))
+
+# IMPORTANT: create these fields in Airtable (single line text, date with time)
+WORKER_FIELD = "worker_id"
+TOKEN_FIELD = "lease_token"
+EXPIRES_FIELD = "lease_expires"
+
+
+def lease_deadline(ttl: float = LEASE_TTL) -> str:
+    expires = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+    return expires.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def lease_expired(fields: dict) -> bool:
+    """True if the record's lease is missing or in the past."""
+    value = fields.get(EXPIRES_FIELD)
+    if not value:
+        return True
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) <= datetime.now(timezone.utc)
+
+
+def claimable(fields: dict) -> bool:
+    """Waiting, or processing under a lease nobody renewed."""
+    status = fields.get("Status")
+    return status == "waiting" or (status == "processing" and lease_expired(fields))
+
+
+# ==============================
+# Leases
+# ==============================
+
+class LeaseManager:
+    """
+    Job claiming on the Airtable table, safe with several workers.
+
+    Airtable has no compare-and-swap, so a claim is:
+      1. read the record, give up unless it is claimable
+      2. write Status=processing + worker id + a fresh lease token + expiry
+      3. wait CLAIM_SETTLE_SECONDS, read the record back
+      4. the claim holds only if our token is still there (last write wins)
+
+    This is only safe if step 2 lands less than CLAIM_SETTLE_SECONDS after
+    step 1: a worker that claimed in between then reads our token back and
+    gives up. Steps 1 and 2 are sent once each (no transport retry) and
+    one limiter interval apart. A claim throttled or running late before
+    its write is started over; one whose write still lands late is
+    abandoned, and the job is picked up again once that lease expires.
+
+    Held leases are renewed by a heartbeat thread, in multi-record PATCHes
+    through the AirtableWriter. The same heartbeat flushes the final
+    updates of released jobs, so a finished job's status reaches Airtable
+    well before its lease could expire.
+
+    With enabled=False (LEASES unset) none of this happens: claim() just
+    sets Status=processing and no lease field is read or written.
+    """
+
+    def __init__(self, table_url: str, headers: dict, writer, limiter=None,
+                 worker_id: str = WORKER_ID, ttl: float = LEASE_TTL,
+                 heartbeat: float = HEARTBEAT_SECONDS, settle: float = CLAIM_SETTLE_SECONDS,
+                 throttle_backoff: float = 0.0, attempts: int = CLAIM_ATTEMPTS,
+                 enabled: bool = LEASES_ENABLED):
+        self.enabled = enabled
+        self.table_url = table_url
+        self.headers = headers
+        self.writer = writer
+        self.limiter = limiter
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.settle = settle
+        self.throttle_backoff = throttle_backoff
+        self.attempts = attempts
+
+        self._held = {}
+        self._released = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- HTTP ----------
+
+    def _acquire(self, tokens: int = 1):
+        if self.limiter:
+            self.limiter.acquire(tokens)
+
+    def _get_fields(self, record_id: str) -> dict:
+        self._acquire()
+        response = get_session().get(f"{self.table_url}/{record_id}", headers=self.headers)
+        response.raise_for_status()
+        return response.json().get("fields", {})
+
+    def _claim_request(self, method: str, record_id: str, fields: dict | None = None):
+        """Send once; None if throttled (the limiter is paused, nothing was written)."""
+        response = get_single_attempt_session().request(
+            method, f"{self.table_url}/{record_id}", headers=self.headers,
+            json={"fields": fields} if fields is not None else None,
+        )
+        if response.status_code == 429:
+            wait = max(float(response.headers.get("Retry-After") or 0), self.throttle_backoff)
+            if self.limiter:
+                self.limiter.pause(wait)
+            else:
+                time.sleep(wait)
+            return None
+        response.raise_for_status()
+        return response
+
+    # ---------- Claim / release ----------
+
+    def claim(self, record_id: str) -> bool:
+        """Try to take the job; False if it is not claimable or another worker won."""
+        if not self.enabled:
+            self._acquire()
+            response = get_session().patch(
+                f"{self.table_url}/{record_id}", headers=self.headers,
+                json={"fields": {"Status": "processing"}},
+            )
+            response.raise_for_status()
+            return True
+
+        for _ in range(self.attempts):
+            claimed = self._try_claim(record_id)
+            if claimed is not None:
+                return claimed
+            print(f"→ Claim of {record_id} throttled or late before its write, starting over")
+
+        print(f"⚠️ Claim of {record_id} given up after {self.attempts} attempts, job left waiting")
+        return False
+
+    def _try_claim(self, record_id: str) -> bool | None:
+        """One claim attempt; None if it should be started over (nothing written)."""
+        # Both tokens are taken together, and the write goes out one limiter
+        # interval after the check (at most half the settle time): the pair
+        # keeps to the rate, and no other request of this process waits in
+        # between.
+        self._acquire(2)
+        checked = time.monotonic()
+        response = self._claim_request("GET", record_id)
+        if response is None:
+            return None
+        if not claimable(response.json().get("fields", {})):
+            return False
+
+        # The write should take about as long as the check did
+        latency = time.monotonic() - checked
+        if self.limiter:
+            spacing = min(1 / self.limiter.rate, self.settle / 2)
+            time.sleep(max(0.0, checked + spacing - time.monotonic()))
+        if time.monotonic() - checked + latency >= self.settle:
+            return None
+
+        token = uuid.uuid4().hex
+        response = self._claim_request("PATCH", record_id, {
+            "Status": "processing",
+            WORKER_FIELD: self.worker_id,
+            TOKEN_FIELD: token,
+            EXPIRES_FIELD: lease_deadline(self.ttl),
+        })
+        if response is None:
+            return None
+
+        elapsed = time.monotonic() - checked
+        if elapsed >= self.settle:
+            # Another worker may have claimed and settled meanwhile; our write
+            # cannot be undone safely, so the lease is left to expire.
+            print(
+                f"⚠️ Claim of {record_id} abandoned: write landed {elapsed:.1f}s after "
+                f"the check (settle time {self.settle}s)"
+            )
+            return False
+
+        time.sleep(self.settle)
+        fields = self._get_fields(record_id)
+        if fields.get(TOKEN_FIELD) != token or fields.get(WORKER_FIELD) != self.worker_id:
+            return False
+
+        with self._lock:
+            self._held[record_id] = token
+        self._ensure_heartbeat()
+        return True
+
+    def release(self, record_id: str) -> dict:
+        """
+        Stop renewing the lease. Returns the fields that clear it, to be
+        merged into the job's final update.
+        """
+        with self._lock:
+            if self._held.pop(record_id, None) is not None:
+                self._released.add(record_id)
+        return {EXPIRES_FIELD: None} if self.enabled else {}
+
+    def held(self) -> list:
+        with self._lock:
+            return list(self._held)
+
+    # ---------- Heartbeat ----------
+
+    def _ensure_heartbeat(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run_heartbeat, name="lease-heartbeat", daemon=True,
+                )
+                self._thread.start()
+
+    def _run_heartbeat(self):
+        while not self._stop.wait(self.heartbeat):
+            self.renew()
+
+    def renew(self):
+        """Extend held leases and send the final updates of released jobs."""
+        with self._lock:
+            held = list(self._held)
+            released = list(self._released)
+            self._released.clear()
+
+        if not held and not released:
+            return
+
+        deadline = lease_deadline(self.ttl)
+        for record_id in held:
+            self.writer.update(record_id, {EXPIRES_FIELD: deadline})
+
+        try:
+            self.writer.flush(held + released)
+        except Exception as e:
+            print(f"⚠️ Lease heartbeat failed, will retry: {e}")
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
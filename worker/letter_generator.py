@@ -1,46 +1,42 @@
-import os
 from datetime import date
-from dotenv import load_dotenv
-from openai import OpenAI
+from llm_dispatcher import get_dispatcher
+from stream_cleaner import LETTER_STOP_MARKERS
 
 
-def generate_cover_letter(custom_cv_text, job_context):
+LETTER_TEMPERATURE = 0.4
+
+SYSTEM_PROMPT = "You write professional, factual and tailored cover letters."
+
+# Fixed metadata (product decision)
+LOCATION = "Saint-Maur-des-Fossés"
+
+# --- Force French date ---
+MONTHS_FR = {
+    1: "janvier",
+    2: "février",
+    3: "mars",
+    4: "avril",
+    5: "mai",
+    6: "juin",
+    7: "juillet",
+    8: "août",
+    9: "septembre",
+    10: "octobre",
+    11: "novembre",
+    12: "décembre",
+}
+
+
+def build_letter_messages(custom_cv_text, job_context):
     """
-    Generate a complete, professional and dynamic cover letter
-    with a fixed location and the current date (French month).
+    Build the chat messages for the cover letter generation.
+    Static instructions come first; the per-job CV, job context and the
+    dated first line come last, so the prefix stays cacheable.
     """
 
-    # Load environment variables at call time (robust)
-    load_dotenv(dotenv_path="worker/.env")
-
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set or not loaded.")
-
-    client = OpenAI(api_key=api_key)
-
-    # Fixed metadata (product decision)
-    location = "Saint-Maur-des-Fossés"
-
-    # --- Force French date ---
-    months_fr = {
-        1: "janvier",
-        2: "février",
-        3: "mars",
-        4: "avril",
-        5: "mai",
-        6: "juin",
-        7: "juillet",
-        8: "août",
-        9: "septembre",
-        10: "octobre",
-        11: "novembre",
-        12: "décembre",
-    }
-
     today = date.today()
-    today_str = f"{today.day} {months_fr[today.month]} {today.year}"
-    # -------------------------
+    today_str = f"{today.day} {MONTHS_FR[today.month]} {today.year}"
+    first_line = f"{LOCATION}, le {today_str}"
 
     prompt = f"""
 You are a professional career advisor.
@@ -48,12 +44,12 @@ You are a professional career advisor.
 You are given:
 1) A TAILORED CV (already adapted to the job)
 2) A JOB CONTEXT
+3) The FIRST LINE of the letter
 
 The cover letter MUST:
 - Be written in French
 - Be complete (header + body + closing)
-- Start EXACTLY with this first line (no variation allowed):
-  "{location}, le {today_str}"
+- Start EXACTLY with the FIRST LINE given below (no variation allowed)
 - Then include:
   - a professional recipient block (generic if needed)
   - a clear subject line related to the job
@@ -64,30 +60,35 @@ The cover letter MUST:
 - Do NOT invent experiences, skills, dates, or locations
 - Length: approximately one page maximum
 
+TAILORED CV:
+{custom_cv_text}
+
 JOB CONTEXT:
 {job_context}
 
-TAILORED CV:
-{custom_cv_text}
+FIRST LINE:
+"{first_line}"
 
 OUTPUT:
 A complete French cover letter starting exactly with:
-"{location}, le {today_str}"
+"{first_line}"
 """
 
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_cover_letter(custom_cv_text, job_context):
+    """
+    Generate a complete, professional and dynamic cover letter
+    with a fixed location and the current date (French month).
+    """
+
+    return get_dispatcher().complete(
         model="gpt-4.1-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": "You write professional, factual and tailored cover letters."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        temperature=0.4
+        messages=build_letter_messages(custom_cv_text, job_context),
+        temperature=LETTER_TEMPERATURE,
+        stop_markers=LETTER_STOP_MARKERS,
     )
-
-    return response.choices[0].message.content.strip()
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import hashlib
+from sqlite_store import SQLiteStore
+
+
+# ==============================
+# Configuration
+# ==============================
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "exports/.llm_cache.sqlite3")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+
+def cache_key(model: str, messages: list, temperature: float, stream: bool = False) -> str:
+    """
+    Content hash of everything that determines a generation. Streamed
+    outputs are cleaned (and possibly cut short) while they arrive, so
+    they are stored apart from raw completions.
+    """
+    request = {
+        "model": model,
+        "messages": [[m["role"], m["content"]] for m in messages],
+        "temperature": temperature,
+    }
+    if stream:
+        # Only added when set: keys of non-streamed entries are unchanged
+        request["stream"] = True
+    payload = json.dumps(
+        request,
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ==============================
+# Cache
+# ==============================
+
+class LLMCache(SQLiteStore):
+    """
+    SQLite-backed, content-addressed cache of LLM outputs.
+    Least recently used entries are evicted once the stored text
+    exceeds `max_bytes`.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS generations (
+            key TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_last_used ON generations(last_used)",
+    )
+
+    def __init__(self, path: str = LLM_CACHE_PATH,
+                 max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        super().__init__(path)
+
+    def get(self, key: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE generations SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            return row[0]
+
+    def put(self, key: str, text: str):
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO generations (key, text, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, text, size, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT key, size FROM generations ORDER BY last_used ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM generations WHERE key = ?", stale)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM generations")
@@ -0,0 +1,334 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from openai import OpenAI, RateLimitError, InternalServerError
+from llm_cache import LLMCache, cache_key
+from rate_limit import RateLimiter
+from metrics import get_metrics, RETRIES, LLM_CALLS, LLM_TOKENS, LLM_COST
+from cost_ledger import get_ledger, current_context
+from stream_cleaner import StreamCleaner
+from singleton import process_wide
+
+
+# ==============================
+# Configuration
+# ==============================
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+OPENAI_MAX_RPM = float(os.getenv("OPENAI_MAX_RPM", "500"))
+OPENAI_MAX_TPM = float(os.getenv("OPENAI_MAX_TPM", "200000"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+# Calls slower than this (seconds) count as congestion for AIMD
+TARGET_LATENCY = float(os.getenv("OPENAI_TARGET_LATENCY", "30"))
+
+MAX_RETRIES = 5
+
+# Set LLM_CACHE_BYPASS=1 to always call the API
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "") == "1"
+
+# Set OPENAI_STREAM=1 to stream completions and stop early on junk output
+OPENAI_STREAM = os.getenv("OPENAI_STREAM", "") == "1"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+# ==============================
+# Dispatcher
+# ==============================
+
+class LLMDispatcher:
+    """
+    Single entry point for OpenAI chat calls.
+
+    - one long-lived client (connection reuse, env loaded once)
+    - request-per-minute and token-per-minute token buckets
+    - AIMD concurrency: +1 slot per window of fast successes,
+      halved on 429, reduced when latency exceeds TARGET_LATENCY
+    - 429 / 5xx retried with exponential backoff
+    - complete() is served from the on-disk LLMCache when possible
+    - in streaming mode, output is cleaned as it arrives and the stream
+      is closed as soon as junk (fences, agent instructions...) starts
+    """
+
+    def __init__(self, rpm: float = OPENAI_MAX_RPM, tpm: float = OPENAI_MAX_TPM,
+                 max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+                 target_latency: float = TARGET_LATENCY):
+        self.requests_bucket = RateLimiter(rpm / 60, burst=max(1, rpm / 60))
+        self.tokens_bucket = RateLimiter(tpm / 60, burst=tpm / 6)
+        self.max_concurrency = max(1, max_concurrency)
+        self.target_latency = target_latency
+
+        self._limit = 1.0
+        self._in_flight = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+        self._client = None
+        self._client_lock = threading.Lock()
+
+        self.use_cache = not LLM_CACHE_BYPASS
+        self._cache = None
+
+        self.use_stream = OPENAI_STREAM
+
+        # One entry per API call: model, prompt/cached/completion tokens
+        self.usage_log = []
+        self._usage_lock = threading.Lock()
+
+    # ---------- Client ----------
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    load_dotenv(dotenv_path="worker/.env")
+                    load_dotenv(dotenv_path=".env")
+
+                    api_key = os.getenv("OPENAI_API_KEY")
+                    if not api_key:
+                        raise RuntimeError("OPENAI_API_KEY is not set or not loaded.")
+
+                    # Retries are handled here so 429s feed the AIMD controller
+                    self._client = OpenAI(api_key=api_key, max_retries=0)
+        return self._client
+
+    @property
+    def cache(self) -> LLMCache:
+        if self._cache is None:
+            with self._client_lock:
+                if self._cache is None:
+                    self._cache = LLMCache()
+        return self._cache
+
+    # ---------- Introspection ----------
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a concurrency slot."""
+        with self._cond:
+            return self._waiting
+
+    @property
+    def concurrency_limit(self) -> int:
+        with self._cond:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    def usage_summary(self, start: int = 0) -> dict:
+        """Totals over the API calls from the `start`-th on, including the prompt cache hit rate."""
+        with self._usage_lock:
+            calls = self.usage_log[start:]
+
+        prompt_tokens = sum(c["prompt_tokens"] for c in calls)
+        cached_tokens = sum(c["cached_tokens"] for c in calls)
+        return {
+            "calls": len(calls),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": sum(c["completion_tokens"] for c in calls),
+            "cache_hit_rate": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+        }
+
+    def record_usage(self, model: str, usage, estimate: dict | None = None,
+                     batch: bool = False) -> dict:
+        """
+        Log one call's token usage (`estimate` is used when usage is missing)
+        and charge its cost to the job / stage of the current usage_context().
+        """
+        if usage is None and estimate is not None:
+            entry = {"model": model, "cached_tokens": 0, "estimated": True, **estimate}
+        else:
+            details = getattr(usage, "prompt_tokens_details", None)
+            entry = {
+                "model": model,
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            }
+        entry["cost_usd"] = get_ledger().record(
+            model,
+            entry["prompt_tokens"],
+            entry["cached_tokens"],
+            entry["completion_tokens"],
+            estimated=entry.get("estimated", False),
+            batch=batch,
+        )
+        with self._usage_lock:
+            self.usage_log.append(entry)
+
+        record_id, stage = current_context()
+        metrics = get_metrics()
+        metrics.inc(LLM_CALLS, model=model)
+        for kind in ("prompt", "cached", "completion"):
+            metrics.inc(LLM_TOKENS, entry[f"{kind}_tokens"], model=model, type=kind)
+        metrics.inc(LLM_COST, entry["cost_usd"], model=model, stage=stage or "-")
+        metrics.event("llm_usage", record_id=record_id, stage=stage, **entry)
+        return entry
+
+    # ---------- AIMD ----------
+
+    def _acquire_slot(self):
+        with self._cond:
+            self._waiting += 1
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._waiting -= 1
+            self._in_flight += 1
+
+    def _release_slot(self, latency: float | None, throttled: bool):
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(1.0, self._limit / 2)
+            elif latency is not None and latency > self.target_latency:
+                self._limit = max(1.0, self._limit * 0.75)
+            elif latency is not None:
+                # Additive increase: about +1 slot per `limit` fast calls
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    # ---------- Calls ----------
+
+    def _dispatch(self, call, prompt_tokens: int, expected_output_tokens: int):
+        """Run `call()` under the rate limits and AIMD slots, retrying 429 / 5xx."""
+        for attempt in range(MAX_RETRIES + 1):
+            self.requests_bucket.acquire()
+            self.tokens_bucket.acquire(prompt_tokens + expected_output_tokens)
+
+            self._acquire_slot()
+            start = time.monotonic()
+            try:
+                with get_metrics().span("openai_call", attempt=attempt):
+                    result = call()
+            except RateLimitError as e:
+                self._release_slot(None, throttled=True)
+                # Quota exhaustion will not recover by waiting
+                if getattr(e, "code", None) == "insufficient_quota" or attempt == MAX_RETRIES:
+                    raise
+                get_metrics().inc(RETRIES, service="openai", reason="429")
+                time.sleep(min(60, 2 ** attempt))
+                continue
+            except InternalServerError:
+                self._release_slot(None, throttled=False)
+                if attempt == MAX_RETRIES:
+                    raise
+                get_metrics().inc(RETRIES, service="openai", reason="5xx")
+                time.sleep(min(60, 2 ** attempt))
+                continue
+            except Exception:
+                self._release_slot(None, throttled=False)
+                raise
+
+            self._release_slot(time.monotonic() - start, throttled=False)
+            return result
+
+    def chat(self, messages: list, model: str = DEFAULT_MODEL,
+             temperature: float = 1.0, expected_output_tokens: int = 1000):
+        """Rate-limited chat completion; returns the OpenAI response."""
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
+        response = self._dispatch(
+            lambda: self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+            ),
+            prompt_tokens,
+            expected_output_tokens,
+        )
+        self.record_usage(model, response.usage)
+        return response
+
+    def stream_text(self, messages: list, model: str = DEFAULT_MODEL,
+                    temperature: float = 1.0, expected_output_tokens: int = 1000,
+                    stop_markers=(), skip_lines=()) -> str:
+        """
+        Streamed chat completion, cleaned incrementally.
+        The stream is closed as soon as the cleaner reports junk.
+        """
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
+        def call():
+            cleaner = StreamCleaner(stop_markers, skip_lines)
+            usage = None
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta and not cleaner.feed(delta):
+                        break
+            finally:
+                stream.close()
+            return cleaner.text(), usage
+
+        text, usage = self._dispatch(call, prompt_tokens, expected_output_tokens)
+
+        # An aborted stream never receives the final usage chunk
+        self.record_usage(model, usage, estimate={
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": estimate_tokens(text),
+        })
+        return text
+
+    def complete(self, messages: list, model: str = DEFAULT_MODEL,
+                 temperature: float = 1.0, expected_output_tokens: int = 1000,
+                 stop_markers=(), skip_lines=()) -> str:
+        """
+        Chat completion text, served from the cache when an identical request
+        exists. Streams (and stops at `stop_markers`) when use_stream is set.
+        """
+        key = cache_key(model, messages, temperature, stream=self.use_stream)
+
+        if self.use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.use_stream:
+            text = self.stream_text(
+                messages,
+                model=model,
+                temperature=temperature,
+                expected_output_tokens=expected_output_tokens,
+                stop_markers=stop_markers,
+                skip_lines=skip_lines,
+            )
+        else:
+            response = self.chat(
+                messages,
+                model=model,
+                temperature=temperature,
+                expected_output_tokens=expected_output_tokens,
+            )
+            text = response.choices[0].message.content.strip()
+
+        if self.use_cache:
+            self.cache.put(key, text)
+        return text
+
+
+@process_wide
+def get_dispatcher() -> LLMDispatcher:
+    """Return the process-wide dispatcher (created on first use)."""
+    return LLMDispatcher()
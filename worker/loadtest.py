@@ -0,0 +1,181 @@
+"""
+Offline load test of worker.main against the local stand-ins
+(fake_airtable, fake_openai, fake_francetravail).
+
+Seeds N waiting jobs, runs the worker on them and reports end-to-end
+throughput and per-stage latency histograms. Nothing leaves the machine;
+PDFs are written to a temporary directory.
+
+    python worker/loadtest.py --jobs 50 --concurrency 8 --openai-latency 2 --openai-429-rate 0.05
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from fake_airtable import start_fake_airtable
+from fake_openai import start_fake_openai
+from fake_francetravail import start_fake_francetravail, TOKEN_PATH, SEARCH_PATH
+
+
+BASE_ID = "appLoadTest"
+TABLE_NAME = "Jobs"
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ==============================
+# Report
+# ==============================
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def print_histogram(stage: str, samples: list, width: int = 40):
+    """Log2 buckets in milliseconds, one bar per bucket."""
+    ms = [s * 1000 for s in samples]
+    print(
+        f"\n{stage}  n={len(ms)}  p50={percentile(ms, 0.5):.0f}ms  "
+        f"p95={percentile(ms, 0.95):.0f}ms  p99={percentile(ms, 0.99):.0f}ms  max={max(ms):.0f}ms"
+    )
+
+    buckets = {}
+    for value in ms:
+        upper = 1
+        while upper < value:
+            upper *= 2
+        buckets[upper] = buckets.get(upper, 0) + 1
+
+    peak = max(buckets.values())
+    for upper in sorted(buckets):
+        bar = "#" * max(1, round(buckets[upper] / peak * width))
+        print(f"  <= {upper:>7} ms {buckets[upper]:>6}  {bar}")
+
+
+def span_durations(spans_path: str) -> dict:
+    """Span name -> durations (seconds), from the worker's spans.jsonl."""
+    durations = {}
+    with open(spans_path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = json.loads(raw)
+            if line["type"] == "span":
+                durations.setdefault(line["name"], []).append(line["duration_s"])
+    return durations
+
+
+def job_latencies(airtable_state) -> list:
+    """Claim ('processing') to final status, from the fake table's timestamps."""
+    latencies = []
+    for times in airtable_state.status_times.values():
+        end = times.get("done", times.get("error"))
+        if "processing" in times and end is not None:
+            latencies.append(end - times["processing"])
+    return latencies
+
+
+# ==============================
+# Run
+# ==============================
+
+def run_loadtest(jobs: int, concurrency: int, openai_latency: float, openai_429_rate: float,
+                 airtable_rps: float, verbose: bool = False):
+    airtable, airtable_url = start_fake_airtable(max_rps=airtable_rps)
+    openai, openai_url = start_fake_openai(latency=openai_latency, rate_limit_rate=openai_429_rate)
+    france_travail, france_travail_url = start_fake_francetravail()
+
+    airtable.state.seed_waiting_jobs(BASE_ID, TABLE_NAME, jobs)
+
+    # Must be set before worker (and its module-level config) is imported
+    os.environ.update(
+        AIRTABLE_API_URL=airtable_url,
+        AIRTABLE_BASE_ID=BASE_ID,
+        AIRTABLE_TABLE_NAME=TABLE_NAME,
+        AIRTABLE_API_KEY="loadtest",
+        # The stand-in has no 30 s lockout after a 429, only Retry-After: 1
+        AIRTABLE_THROTTLE_BACKOFF="1",
+        OPENAI_BASE_URL=openai_url,
+        OPENAI_API_KEY="loadtest",
+        LLM_CACHE_BYPASS="1",
+        FRANCE_TRAVAIL_TOKEN_URL=france_travail_url + TOKEN_PATH,
+        FRANCE_TRAVAIL_SEARCH_URL=france_travail_url + SEARCH_PATH,
+        FRANCE_TRAVAIL_CLIENT_ID="loadtest",
+        FRANCE_TRAVAIL_CLIENT_SECRET="loadtest",
+    )
+
+    # Exports, render manifest and cache go to a scratch directory
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    os.makedirs(os.path.join(workdir, "worker"))
+    shutil.copy(os.path.join(WORKER_DIR, "cv_default.md"), os.path.join(workdir, "worker"))
+    os.chdir(workdir)
+
+    import worker
+    from metrics import get_metrics, RETRIES
+
+    print(f"→ {jobs} job(s), concurrency {concurrency}, OpenAI latency {openai_latency}s, "
+          f"429 rate {openai_429_rate:.0%}, Airtable {airtable_rps:g} req/s")
+
+    start = time.perf_counter()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        worker.main(concurrency=concurrency, use_cache=False)
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for record in airtable.state.table(BASE_ID, TABLE_NAME).values():
+        status = record["fields"].get("Status")
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"\nElapsed      : {elapsed:.1f}s")
+    print(f"Jobs         : {statuses}")
+    print(f"Throughput   : {statuses.get('done', 0) / elapsed * 60:.1f} jobs/min")
+    print(f"Airtable     : {airtable.state.requests} requests, {airtable.state.rate_limited} throttled (429)")
+    print(f"OpenAI       : {openai.state.completions} completions, {openai.state.rate_limited} throttled (429)")
+    metrics = get_metrics()
+    print(f"Retries      : OpenAI {metrics.counter_value(RETRIES, service='openai', reason='429'):g}, "
+          f"Airtable {metrics.counter_value(RETRIES, service='127.0.0.1', reason='429'):g}")
+    print(f"Exports      : {workdir}/exports (metrics in exports/metrics)")
+
+    latencies = job_latencies(airtable.state)
+    if latencies:
+        print_histogram("job (claim → final status)", latencies)
+    # Stage spans written by the worker (see metrics.py)
+    durations = span_durations(os.path.join("exports", "metrics", "spans.jsonl"))
+    for stage in ("airtable_fetch", "claim", "llm_cv", "llm_letter", "openai_call",
+                  "render_cv", "render_letter", "airtable_patch"):
+        if durations.get(stage):
+            print_histogram(stage, durations[stage])
+
+    worker.get_render_service().shutdown()
+    for server in (airtable, openai, france_travail):
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test of the worker")
+    parser.add_argument("--jobs", type=int, default=50, help="waiting jobs to seed (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=4, help="worker --concurrency (default: 4)")
+    parser.add_argument("--openai-latency", type=float, default=1.0,
+                        help="mean OpenAI response time in seconds (default: 1)")
+    parser.add_argument("--openai-429-rate", type=float, default=0.0,
+                        help="share of OpenAI calls answered with 429 (default: 0)")
+    parser.add_argument("--airtable-rps", type=float, default=5.0,
+                        help="Airtable requests per second before 429 (default: 5)")
+    parser.add_argument("--verbose", action="store_true", help="show the worker's own output")
+    args = parser.parse_args()
+
+    run_loadtest(
+        jobs=args.jobs,
+        concurrency=args.concurrency,
+        openai_latency=args.openai_latency,
+        openai_429_rate=args.openai_429_rate,
+        airtable_rps=args.airtable_rps,
+        verbose=args.verbose,
+    )
+    sys.exit(0)
@@ -0,0 +1,213 @@
+import re
+from typing import NamedTuple
+
+
+# ======================
+# Blocks
+# ======================
+
+class Block(NamedTuple):
+    """
+    One typed piece of a document.
+
+    CV kinds      : header, identity, intro, section, bullet, paragraph, blank
+    Letter kinds  : date, recipient, subject, paragraph, signature
+    """
+    kind: str
+    text: str
+
+
+# Precompiled once (strip_md runs on every line)
+BOLD_RE = re.compile(r"^\*\*(.+?)\*\*$")
+ITALIC_RE = re.compile(r"^\*(.+?)\*$")
+HEADING_RE = re.compile(r"^#+\s*")
+
+
+# ======================
+# Helpers
+# ======================
+
+def strip_md(text: str) -> str:
+    if not text:
+        return ""
+    text = text.strip()
+    # The emphasis patterns can only match text starting with "*"
+    if text.startswith("*"):
+        text = BOLD_RE.sub(r"\1", text)
+        text = ITALIC_RE.sub(r"\1", text)
+    if text.startswith("#"):
+        text = HEADING_RE.sub("", text)
+    return text.strip()
+
+
+def is_section_title(line: str) -> bool:
+    return _is_title(strip_md(line))
+
+
+def _is_title(clean: str) -> bool:
+    """Short and ALL CAPS (at least one letter). `clean` is already stripped."""
+    if len(clean) >= 40:
+        return False
+
+    has_letter = False
+    for c in clean:
+        if c.isalpha():
+            if c.upper() != c:
+                return False
+            has_letter = True
+    return has_letter
+
+
+def split_cv_blocks(markdown_text: str):
+    """
+    Returns 3 blocks:
+      - identity_lines: header + identity (until the blank line that follows identity)
+      - intro_text: first paragraph after identity (merged into a single string)
+      - body_lines: remaining lines (sections, bullets, etc.)
+    """
+    lines = markdown_text.splitlines()
+    n = len(lines)
+
+    # 1) IDENTITY: from top until the blank line AFTER "Disponible immédiatement" block
+    identity = []
+    filled = 0
+    i = 0
+
+    # consume leading empty lines (just in case)
+    while i < n and lines[i].strip() == "":
+        i += 1
+
+    # take first line (header) + following lines until we hit an empty line
+    # then keep consuming non-empty identity lines until next empty line ends identity
+    while i < n:
+        identity.append(lines[i])
+        if lines[i].strip():
+            filled += 1
+        i += 1
+        # identity ends at the first empty line AFTER at least 2 non-empty identity lines
+        if i < n and lines[i].strip() == "" and filled >= 2:
+            # consume exactly one empty line that separates identity from intro
+            identity.append(lines[i])
+            i += 1
+            break
+
+    # skip any extra empty lines between identity and intro
+    while i < n and lines[i].strip() == "":
+        i += 1
+
+    # 2) INTRO: first paragraph (accumulate until blank line)
+    intro_parts = []
+    while i < n and lines[i].strip() != "":
+        intro_parts.append(lines[i].strip())
+        i += 1
+
+    intro_text = " ".join(intro_parts).strip()
+
+    # skip blank lines after intro
+    while i < n and lines[i].strip() == "":
+        i += 1
+
+    # 3) BODY: rest
+    body = lines[i:] if i < n else []
+
+    return identity, intro_text, body
+
+
+# ======================
+# Tokenizers
+# ======================
+
+def tokenize_cv(markdown_text: str) -> list:
+    """
+    Turn CV markdown into blocks, in order:
+    header, identity*, intro?, then body blocks (section, bullet,
+    paragraph, blank). All texts are already stripped of markdown.
+    """
+    identity_lines, intro_text, body_lines = split_cv_blocks(markdown_text)
+
+    header = next((l for l in identity_lines if l.strip()), None)
+    if header is None:
+        raise ValueError("CV structure invalid: no header line")
+
+    blocks = [Block("header", strip_md(header))]
+
+    started = False
+    for line in identity_lines:
+        clean = strip_md(line)
+        if not clean:
+            continue
+        if not started:
+            started = True
+            continue  # header line
+        blocks.append(Block("identity", clean))
+
+    if intro_text:
+        blocks.append(Block("intro", strip_md(intro_text)))
+
+    for line in body_lines:
+        raw = line.strip()
+
+        if not raw:
+            blocks.append(Block("blank", ""))
+            continue
+
+        clean = strip_md(raw)
+
+        # Section titles (ALL CAPS)
+        if _is_title(clean):
+            blocks.append(Block("section", clean))
+        elif raw.startswith("•"):
+            blocks.append(Block("bullet", strip_md(raw[1:])))
+        else:
+            blocks.append(Block("paragraph", clean))
+
+    return blocks
+
+
+def tokenize_letter(markdown_text: str) -> list:
+    """
+    Turn a cover letter into blocks: date, recipient, subject, then
+    paragraphs, the last one being the signature. Blocks are separated
+    by empty lines; lines inside a block are joined with <br/>.
+    """
+    # ---------- Expected structure ----------
+    # block 0: date / location (first line)
+    # block 1: recipient (right aligned)
+    # block 2: object (first line)
+    # block 3+: body paragraphs + closing + signature
+
+    # One pass over the lines: a blank line closes the current block. Every
+    # block is built as a paragraph; the first three and the last one are
+    # given their kind once the end is known.
+    blocks = []
+    current = []
+    for line in markdown_text.strip().splitlines():
+        line = line.rstrip()
+        if line:
+            current.append(line)
+            continue
+        if current:
+            if len(blocks) < 3:
+                blocks.append(_letter_head(len(blocks), current))
+            else:
+                blocks.append(Block("paragraph", "<br/>".join(current)))
+            current = []
+
+    if current:
+        if len(blocks) < 3:
+            blocks.append(_letter_head(len(blocks), current))
+        else:
+            blocks.append(Block("signature", "<br/>".join(current)))
+
+    if len(blocks) < 4:
+        raise ValueError("Letter structure invalid: not enough blocks")
+
+    return blocks
+
+
+def _letter_head(index: int, lines: list) -> Block:
+    if index == 0:
+        return Block("date", lines[0])
+    if index == 1:
+        return Block("recipient", "<br/>".join(lines))
+    return Block("subject", lines[0])
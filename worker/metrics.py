@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from singleton import process_wide
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Spans (JSON lines) and the Prometheus textfile go here; set to "" to
+# keep metrics in memory only.
+METRICS_DIR = os.getenv("METRICS_DIR", "exports/metrics")
+
+SPANS_FILE = "spans.jsonl"
+TEXTFILE = "genai_jobs.prom"
+
+# Seconds; covers Airtable calls (ms) up to slow LLM generations (minutes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+SPAN_DURATION = "genai_jobs_span_duration_seconds"
+SPAN_ERRORS = "genai_jobs_span_errors_total"
+RETRIES = "genai_jobs_retries_total"
+LLM_CALLS = "genai_jobs_llm_calls_total"
+LLM_TOKENS = "genai_jobs_llm_tokens_total"
+LLM_COST = "genai_jobs_llm_cost_usd_total"
+JOBS = "genai_jobs_jobs_total"
+
+METRIC_HELP = {
+    SPAN_DURATION: ("histogram", "Duration of instrumented stages (fetch, claim, LLM calls, PATCHes, renders)."),
+    SPAN_ERRORS: ("counter", "Stages that ended with an exception."),
+    RETRIES: ("counter", "Retried requests, by service and reason."),
+    LLM_CALLS: ("counter", "OpenAI API calls."),
+    LLM_TOKENS: ("counter", "OpenAI tokens, by model and type (prompt, cached, completion)."),
+    LLM_COST: ("counter", "OpenAI cost in USD, by model and stage."),
+    JOBS: ("counter", "Jobs that reached a final status."),
+}
+
+
+# ==============================
+# Metrics
+# ==============================
+
+class Metrics:
+    """
+    In-process counters and histograms, plus timed spans.
+
+    Every span is appended to spans.jsonl as soon as it ends and feeds the
+    SPAN_DURATION histogram; write_textfile() dumps everything in the
+    Prometheus text format (for node_exporter's textfile collector).
+    """
+
+    def __init__(self, metrics_dir: str = METRICS_DIR):
+        self.metrics_dir = metrics_dir
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._spans_file = None
+
+    # ---------- Recording ----------
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    "buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0,
+                }
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def event(self, name: str, **fields):
+        """Write a JSON line that is not a timed span (e.g. token usage)."""
+        self._write({"ts": round(time.time(), 3), "type": "event", "name": name, **fields})
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        Time the block. The yielded dict can be filled with extra fields
+        (record id, token counts...) that end up in the JSON line.
+        """
+        ts = time.time()
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield attrs
+        except Exception as e:
+            status = "error"
+            attrs["error"] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.observe(SPAN_DURATION, duration, span=name)
+            if status == "error":
+                self.inc(SPAN_ERRORS, span=name)
+            self._write({
+                "ts": round(ts, 3),
+                "type": "span",
+                "name": name,
+                "duration_s": round(duration, 6),
+                "status": status,
+                "thread": threading.current_thread().name,
+                **attrs,
+            })
+
+    def _write(self, line: dict):
+        if not self.metrics_dir:
+            return
+        with self._lock:
+            if self._spans_file is None:
+                os.makedirs(self.metrics_dir, exist_ok=True)
+                self._spans_file = open(
+                    os.path.join(self.metrics_dir, SPANS_FILE), "a", encoding="utf-8", buffering=1,
+                )
+            self._spans_file.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+    # ---------- Export ----------
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def render_textfile(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: {**v, "buckets": list(v["buckets"])} for k, v in self._histograms.items()}
+
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        lines = []
+        for name in names:
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, histogram["buckets"]):
+                    lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {count}")
+                lines.append(f"{name}_bucket{_labels(labels, le='+Inf')} {histogram['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(histogram['sum'])}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self):
+        """Atomically (re)write the Prometheus textfile."""
+        if not self.metrics_dir:
+            return
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, TEXTFILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.render_textfile())
+        os.replace(path + ".tmp", path)
+
+
+def _labels(labels: tuple, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+@process_wide
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry (created on first use)."""
+    return Metrics()
@@ -0,0 +1,107 @@
+import os
+import json
+import time
+import threading
+from file_lock import file_lock
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Refresh this long before the token expires, so no request is sent
+# with a token that dies in flight.
+TOKEN_REFRESH_MARGIN = float(os.getenv("OAUTH_TOKEN_REFRESH_MARGIN", "60"))
+
+
+# ==============================
+# Provider
+# ==============================
+
+class TokenProvider:
+    """
+    OAuth2 access token cached in memory and in a JSON file shared by all
+    processes on the machine.
+
+    `request_token()` performs the real round trip and returns
+    (access_token, expires_in). It runs at most once at a time: threads
+    are serialised by a lock, processes by an exclusive lock on
+    `<cache_path>.lock`; whoever waited then finds the fresh token.
+    """
+
+    def __init__(self, request_token, cache_path: str, key: str = "default",
+                 margin: float = TOKEN_REFRESH_MARGIN):
+        self.request_token = request_token
+        self.cache_path = cache_path
+        self.key = key
+        self.margin = margin
+
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+        self.refreshes = 0
+
+    def _fresh(self, expires_at: float) -> bool:
+        return time.time() < expires_at - self.margin
+
+    # ---------- Disk cache ----------
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, entries: dict):
+        if os.path.dirname(self.cache_path):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        # The file holds a bearer token: owner-only permissions
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.cache_path)
+
+    # ---------- Tokens ----------
+
+    def get(self) -> str:
+        """A token valid for at least `margin` seconds."""
+        token, expires_at = self._token, self._expires_at
+        if token and self._fresh(expires_at):
+            return token
+
+        with self._lock:
+            if self._token and self._fresh(self._expires_at):
+                return self._token
+
+            with file_lock(self.cache_path):
+                # Another process may have refreshed it while we waited
+                entries = self._read_cache()
+                cached = entries.get(self.key)
+                if cached and self._fresh(cached["expires_at"]):
+                    self._token, self._expires_at = cached["access_token"], cached["expires_at"]
+                    return self._token
+
+                requested_at = time.time()
+                token, expires_in = self.request_token()
+                self.refreshes += 1
+
+                expires_at = requested_at + float(expires_in)
+                entries[self.key] = {"access_token": token, "expires_at": expires_at}
+                self._write_cache(entries)
+
+                self._token, self._expires_at = token, expires_at
+                return token
+
+    def invalidate(self, token: str):
+        """Drop a token the API rejected (401), unless it was already replaced."""
+        with self._lock:
+            if self._token == token:
+                self._token, self._expires_at = None, 0.0
+            with file_lock(self.cache_path):
+                entries = self._read_cache()
+                if entries.get(self.key, {}).get("access_token") == token:
+                    del entries[self.key]
+                    self._write_cache(entries)
@@ -0,0 +1,136 @@
+from functools import lru_cache
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+from reportlab.platypus import Paragraph
+
+
+# ======================
+# Styles (built once per process)
+# ======================
+
+@lru_cache(maxsize=1)
+def cv_styles() -> dict:
+    styles = getSampleStyleSheet()
+
+    return {
+        "title": ParagraphStyle(
+            "Title",
+            parent=styles["Normal"],
+            fontSize=16,
+            leading=16,
+            alignment=TA_CENTER,
+            spaceAfter=16,
+            fontName="Helvetica-Bold",
+        ),
+        "identity": ParagraphStyle(
+            "Identity",
+            parent=styles["Normal"],
+            fontSize=10,
+            leading=12,
+            alignment=TA_LEFT,
+            spaceAfter=2,
+        ),
+        "intro": ParagraphStyle(
+            "Intro",
+            parent=styles["Normal"],
+            fontSize=11,
+            leading=13,
+            alignment=TA_JUSTIFY,
+            spaceBefore=8,
+            spaceAfter=0,
+        ),
+        "section": ParagraphStyle(
+            "Section",
+            parent=styles["Normal"],
+            fontSize=12,
+            leading=12,
+            fontName="Helvetica-Bold",
+            alignment=TA_LEFT,
+            spaceBefore=8,
+            spaceAfter=4,
+        ),
+        "normal": ParagraphStyle(
+            "NormalText",
+            parent=styles["Normal"],
+            fontSize=11,
+            leading=14,
+            alignment=TA_LEFT,
+            spaceAfter=2,
+        ),
+        "bullet": ParagraphStyle(
+            "Bullet",
+            parent=styles["Normal"],
+            fontSize=11,
+            leading=14,
+            alignment=TA_LEFT,
+            leftIndent=6,
+            spaceAfter=1,
+        ),
+    }
+
+
+@lru_cache(maxsize=1)
+def letter_styles() -> dict:
+    return {
+        "date": ParagraphStyle(
+            "DateStyle",
+            alignment=TA_LEFT,
+            fontSize=11,
+            spaceAfter=14,
+        ),
+        "recipient": ParagraphStyle(
+            "RecipientStyle",
+            alignment=TA_RIGHT,
+            fontSize=11,
+            spaceAfter=18,
+        ),
+        "object": ParagraphStyle(
+            "ObjectStyle",
+            alignment=TA_LEFT,
+            fontSize=11,
+            spaceAfter=14,
+            fontName="Helvetica-Bold",
+        ),
+        "body": ParagraphStyle(
+            "BodyStyle",
+            alignment=TA_JUSTIFY,
+            fontSize=11,
+            leading=14,
+            spaceAfter=12,
+        ),
+        "closing": ParagraphStyle(
+            "ClosingStyle",
+            alignment=TA_LEFT,
+            fontSize=11,
+            spaceBefore=18,
+        ),
+        "signature": ParagraphStyle(
+            "SignatureStyle",
+            alignment=TA_LEFT,
+            fontSize=11,
+            spaceBefore=12,
+        ),
+    }
+
+
+# ======================
+# Cached flowables
+# ======================
+
+@lru_cache(maxsize=1024)
+def _parse_paragraph(text: str, style: ParagraphStyle):
+    # Markup parsing is the costly part of a Paragraph; layout state
+    # (wrap / split) lives on each new instance, so the parsed fragments
+    # can be shared between documents.
+    parsed = Paragraph(text, style)
+    return parsed.style, parsed.frags, parsed.bulletText
+
+
+def cached_paragraph(text: str, style: ParagraphStyle) -> Paragraph:
+    """
+    Paragraph for text that repeats across documents (identity block,
+    section titles, bullets taken from cv_default.md).
+    Only use with the cached styles above.
+    """
+    parsed_style, frags, bullet_text = _parse_paragraph(text, style)
+    return Paragraph(text, parsed_style, bullet_text, frags=frags)
@@ -0,0 +1,270 @@
+"""
+Fan-out search over keyword × commune × contract grids.
+
+A search spec (YAML or JSON) lists, per source, the values to combine:
+
+    keywords: [ingénieur chimiste, ingénieur procédés]
+    sources:
+      france_travail:
+        communes: ["75056", "69123"]
+        contract_types: [CDI, CDD]
+        max_offers: 300
+        incremental: true        # only new / updated offers (francetravail_sync)
+      indeed:
+        locations: [Paris, Lyon]
+        limit: 20
+
+Every combination is one query. Queries run concurrently (per-source
+concurrency; each source's own rate limiter paces its requests), offers
+are merged by ID as they arrive, and the per-query yield shows which
+queries bring nothing new.
+
+    python worker/query_planner.py searches.yaml --output exports/offers.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import yaml
+except ImportError:  # only needed for .yaml / .yml specs
+    yaml = None
+
+
+# ==============================
+# Sources
+# ==============================
+
+def search_france_travail(keyword: str, commune: str | None = None,
+                          contract_type: str | None = None, max_offers: int | None = None,
+                          incremental: bool = False):
+    if incremental:
+        from francetravail_sync import sync_france_travail_offers
+        return sync_france_travail_offers(
+            keyword, contract_type=contract_type, commune_insee=commune,
+        )
+
+    from fetch_francetravail import harvest_france_travail_offers
+    return harvest_france_travail_offers(
+        keyword, contract_type=contract_type, commune_insee=commune, max_offers=max_offers,
+    )
+
+
+def search_indeed(keyword: str, location: str = "", limit: int = 10):
+    from fetch_indeed import fetch_indeed_jobs
+    return fetch_indeed_jobs(query=keyword, location=location, limit=limit)
+
+
+# source -> (search function, {spec list key: search argument}, default concurrency)
+SOURCES = {
+    "france_travail": (
+        search_france_travail,
+        {"keywords": "keyword", "communes": "commune", "contract_types": "contract_type"},
+        4,
+    ),
+    "indeed": (
+        search_indeed,
+        {"keywords": "keyword", "locations": "location"},
+        1,
+    ),
+}
+
+# Spec keys that are not grid dimensions nor search arguments
+SOURCE_OPTIONS = ("concurrency",)
+
+
+# ==============================
+# Plan
+# ==============================
+
+def load_spec(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("PyYAML is required for YAML specs (pip install pyyaml), or use JSON")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def plan_queries(spec: dict) -> list:
+    """
+    Expand the spec into queries: dicts with `source`, `params` (search
+    arguments) and a readable `label`. Missing grid lists mean "any".
+    """
+    unknown = set(spec.get("sources", {})) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+
+    queries = []
+    for source, options in spec.get("sources", {}).items():
+        options = options or {}
+        _, dimensions, _ = SOURCES[source]
+
+        grid = []
+        for list_key, argument in dimensions.items():
+            values = options.get(list_key, spec.get(list_key)) or [None]
+            if isinstance(values, (str, int)):
+                values = [values]
+            if argument == "keyword" and values == [None]:
+                raise ValueError(f"{source}: no keywords")
+            grid.append([(argument, value) for value in values])
+
+        fixed = {
+            k: v for k, v in options.items()
+            if k not in dimensions and k not in SOURCE_OPTIONS
+        }
+
+        for combination in itertools.product(*grid):
+            params = {argument: value for argument, value in combination if value is not None}
+            label = " / ".join(str(value) for _, value in combination if value is not None)
+            queries.append({"source": source, "params": {**params, **fixed}, "label": label})
+
+    return queries
+
+
+# ==============================
+# Run
+# ==============================
+
+class PlanRun:
+    """
+    Runs the queries and streams unique offers. After (or during) the run,
+    `stats` holds per query: offers returned, unique (first seen by this
+    query), duplicates, error and duration.
+    """
+
+    def __init__(self, queries: list, spec: dict | None = None):
+        self.queries = queries
+        self.spec = spec or {}
+        self.stats = [
+            {"source": q["source"], "label": q["label"], "offers": 0, "unique": 0,
+             "duplicates": 0, "error": None, "duration_s": None}
+            for q in queries
+        ]
+        self.seen = set()
+        self._stop = threading.Event()
+
+    def _concurrency(self, source: str) -> int:
+        options = self.spec.get("sources", {}).get(source) or {}
+        return int(options.get("concurrency", SOURCES[source][2]))
+
+    def _run_query(self, index: int, results: queue.Queue):
+        query = self.queries[index]
+        search, _, _ = SOURCES[query["source"]]
+        start = time.perf_counter()
+        error = None
+        try:
+            if not self._stop.is_set():
+                for offer in search(**query["params"]):
+                    if self._stop.is_set():
+                        break
+                    results.put(("offer", index, offer))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self.stats[index]["duration_s"] = round(time.perf_counter() - start, 3)
+            results.put(("done", index, error))
+
+    def offers(self):
+        """Yield each offer once (first query to return its ID wins), as queries progress."""
+        results = queue.Queue()
+        pools = {
+            source: ThreadPoolExecutor(
+                max_workers=max(1, self._concurrency(source)),
+                thread_name_prefix=f"plan-{source}",
+            )
+            for source in {q["source"] for q in self.queries}
+        }
+
+        try:
+            for index, query in enumerate(self.queries):
+                pools[query["source"]].submit(self._run_query, index, results)
+
+            pending = len(self.queries)
+            while pending:
+                kind, index, payload = results.get()
+                stats = self.stats[index]
+
+                if kind == "done":
+                    pending -= 1
+                    stats["error"] = payload
+                    continue
+
+                stats["offers"] += 1
+                key = (self.queries[index]["source"], payload.get("id") or payload.get("url"))
+                if key in self.seen:
+                    stats["duplicates"] += 1
+                    continue
+                self.seen.add(key)
+                stats["unique"] += 1
+                yield payload
+        finally:
+            # Caller stopped early: running queries stop at their next offer
+            self._stop.set()
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+def print_yield_report(stats: list):
+    """Per-query yield, least productive first."""
+    print(f"\n{'unique':>7} {'offers':>7} {'dup':>6} {'time':>7}  query")
+    for s in sorted(stats, key=lambda s: (s["unique"], s["offers"])):
+        flag = f"  ❌ {s['error']}" if s["error"] else ("  ← no new offers" if not s["unique"] else "")
+        duration = f"{s['duration_s']:.1f}s" if s["duration_s"] is not None else "-"
+        print(
+            f"{s['unique']:>7} {s['offers']:>7} {s['duplicates']:>6} {duration:>7}  "
+            f"{s['source']}: {s['label']}{flag}"
+        )
+
+
+# ==============================
+# CLI
+# ==============================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every search of a keyword × commune × contract grid")
+    parser.add_argument("spec", help="search spec (.yaml / .yml / .json)")
+    parser.add_argument("--output", help="write unique offers as JSON lines (default: stdout summary only)")
+    parser.add_argument("--report", help="write the per-query yield as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="list the planned queries without running them")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    queries = plan_queries(spec)
+
+    if args.dry_run:
+        for query in queries:
+            print(f"{query['source']}: {query['label']}  {json.dumps(query['params'], ensure_ascii=False)}")
+        print(f"{len(queries)} query(ies) planned.")
+        sys.exit(0)
+
+    print(f"→ {len(queries)} query(ies) planned")
+    run = PlanRun(queries, spec)
+    start = time.perf_counter()
+
+    if args.output and os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+    count = 0
+    try:
+        for offer in run.offers():
+            count += 1
+            if out:
+                out.write(json.dumps(offer, ensure_ascii=False) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    print_yield_report(run.stats)
+    print(f"\n{count} unique offer(s) in {time.perf_counter() - start:.1f}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(run.stats, f, ensure_ascii=False, indent=2)
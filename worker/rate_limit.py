@@ -0,0 +1,45 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+    `rate` tokens are added per second, up to `burst` tokens.
+    """
+
+    def __init__(self, rate: float, burst: float = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1):
+        """Block until `tokens` are available, then consume them."""
+        # A request larger than the bucket is let through once the bucket is
+        # full; the bucket goes negative and the debt is paid by later callers.
+        needed = min(tokens, self.burst)
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out no token for `seconds` (e.g. after a 429); never shortens a pause."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
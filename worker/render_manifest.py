@@ -0,0 +1,134 @@
+import os
+import json
+import hashlib
+import threading
+from file_lock import file_lock
+
+
+# ==============================
+# Configuration
+# ==============================
+
+MANIFEST_PATH = "exports/.render_manifest.json"
+
+# Markdown inputs are kept (content-addressed) so stale PDFs can be re-rendered
+SOURCES_DIR = "exports/.sources"
+
+# Bump when pdf_exporter / pdf_exporter_letter / pdf_templates change the
+# output: every PDF of that kind becomes stale for `rebuild-exports`.
+RENDERER_VERSIONS = {
+    "cv": "1",
+    "letter": "1",
+}
+
+
+def content_hash(markdown_text: str) -> str:
+    return hashlib.sha256(markdown_text.encode("utf-8")).hexdigest()
+
+
+# ==============================
+# Manifest
+# ==============================
+
+class RenderManifest:
+    """
+    Records, for each exported PDF, the hash of its markdown input and the
+    renderer version. A render whose input and version are unchanged and
+    whose PDF still exists can be skipped.
+
+    Several workers can share the file: each write re-reads it under a
+    file lock and adds its entry, so no process drops another's entries.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH, sources_dir: str = SOURCES_DIR):
+        self.path = path
+        self.sources_dir = sources_dir
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            # Worst case every PDF is rendered again; never fail the job
+            print(f"⚠️ Render manifest unreadable, starting from scratch: {e}")
+            return {}
+
+    def _save(self, entries: dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _source_path(self, digest: str) -> str:
+        return os.path.join(self.sources_dir, f"{digest}.md")
+
+    def is_current(self, output_path: str, markdown_text: str, kind: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(output_path)
+        return (
+            entry is not None
+            and entry["kind"] == kind
+            and entry["sha256"] == content_hash(markdown_text)
+            and entry["renderer_version"] == RENDERER_VERSIONS[kind]
+            and os.path.exists(output_path)
+        )
+
+    def record(self, output_path: str, markdown_text: str, kind: str):
+        digest = content_hash(markdown_text)
+
+        source_path = self._source_path(digest)
+        if not os.path.exists(source_path):
+            os.makedirs(self.sources_dir, exist_ok=True)
+            with open(source_path, "w", encoding="utf-8") as f:
+                f.write(markdown_text)
+
+        with self._lock, file_lock(self.path):
+            # Entries recorded by other processes since this one loaded the file
+            entries = self._load()
+            entries[output_path] = {
+                "kind": kind,
+                "sha256": digest,
+                "renderer_version": RENDERER_VERSIONS[kind],
+            }
+            self._save(entries)
+            self._entries = entries
+
+    def stale(self) -> list:
+        """(output_path, kind, markdown) for PDFs that need a re-render."""
+        with self._lock:
+            entries = dict(self._entries)
+
+        stale = []
+        for output_path, entry in sorted(entries.items()):
+            if (
+                entry["renderer_version"] == RENDERER_VERSIONS[entry["kind"]]
+                and os.path.exists(output_path)
+            ):
+                continue
+
+            source_path = self._source_path(entry["sha256"])
+            if not os.path.exists(source_path):
+                continue
+            with open(source_path, "r", encoding="utf-8") as f:
+                stale.append((output_path, entry["kind"], f.read()))
+        return stale
+
+    def prune_sources(self) -> int:
+        """Delete stored markdown inputs no longer referenced by any PDF."""
+        if not os.path.isdir(self.sources_dir):
+            return 0
+
+        with self._lock:
+            used = {f"{e['sha256']}.md" for e in self._entries.values()}
+
+        removed = 0
+        for name in os.listdir(self.sources_dir):
+            if name not in used:
+                os.remove(os.path.join(self.sources_dir, name))
+                removed += 1
+        return removed
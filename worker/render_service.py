@@ -0,0 +1,181 @@
+import os
+import uuid
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from render_manifest import RenderManifest
+from singleton import process_wide
+
+
+# ==============================
+# Configuration
+# ==============================
+
+# Render processes (0 = render in the calling process)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+
+DOCUMENT_KINDS = ("cv", "letter")
+
+# Render processes are started fresh, not fork()ed: the pool is created
+# while job, stage and lease threads are running, and forking a
+# multi-threaded process can deadlock the child. _warm_up pays the imports.
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+# ==============================
+# Worker process side
+# ==============================
+
+def _warm_up():
+    """Process initializer: import reportlab and the exporters, build the styles."""
+    for module in ("pdf_exporter", "pdf_exporter_letter"):
+        importlib.import_module(module)
+    from pdf_templates import cv_styles, letter_styles
+
+    cv_styles()
+    letter_styles()
+
+
+def render_document(markdown_text: str, output_path: str, kind: str) -> str:
+    """
+    Render one document to `output_path` and return the path.
+    The PDF is written to a temporary file of its own in the same directory
+    and moved into place, so an open PDF viewer never sees a half-written
+    file and two renders of the same path never write to the same file.
+    """
+    if kind == "cv":
+        from pdf_exporter import export_markdown_to_pdf as export
+    elif kind == "letter":
+        from pdf_exporter_letter import export_letter_to_pdf as export
+    else:
+        raise ValueError(f"Unknown document kind: {kind!r} (expected one of {DOCUMENT_KINDS})")
+
+    directory = os.path.dirname(output_path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    tmp_path = os.path.join(directory, f".{stem}.{os.getpid()}.{uuid.uuid4().hex}.pdf")
+
+    try:
+        export(markdown_text, tmp_path)
+
+        try:
+            os.replace(tmp_path, output_path)
+        except PermissionError:
+            raise RuntimeError(
+                f"Le fichier PDF est ouvert. "
+                f"Fermez-le puis relancez le worker : {output_path}"
+            )
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return output_path
+
+
+# ==============================
+# Orchestrator side
+# ==============================
+
+class RenderService:
+    """
+    Runs reportlab renders in a pool of warm worker processes, so CPU-bound
+    layout work uses every core instead of competing for the GIL.
+    submit() returns a Future resolving to the output path.
+
+    Renders are skipped when the render manifest shows the PDF was already
+    produced from the same markdown by the same renderer version.
+    """
+
+    def __init__(self, max_workers: int = RENDER_WORKERS):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    @property
+    def manifest(self) -> RenderManifest:
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    self._manifest = RenderManifest()
+        return self._manifest
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=MP_CONTEXT,
+                        initializer=_warm_up,
+                    )
+        return self._pool
+
+    def submit(self, markdown_text: str, output_path: str, kind: str,
+               force: bool = False) -> Future:
+        if not force and self.manifest.is_current(output_path, markdown_text, kind):
+            future = Future()
+            future.set_result(output_path)
+            return future
+
+        if self.max_workers <= 0:
+            future = Future()
+            try:
+                render_document(markdown_text, output_path, kind)
+                self.manifest.record(output_path, markdown_text, kind)
+                future.set_result(output_path)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        future = self._get_pool().submit(render_document, markdown_text, output_path, kind)
+
+        def record(done: Future):
+            if done.exception() is None:
+                self.manifest.record(output_path, markdown_text, kind)
+
+        future.add_done_callback(record)
+        return future
+
+    def rebuild_stale(self) -> tuple:
+        """Re-render every stale PDF in the manifest; returns (rendered, failed)."""
+        futures = {
+            self.submit(markdown_text, output_path, kind, force=True): (output_path, kind, markdown_text)
+            for output_path, kind, markdown_text in self.manifest.stale()
+        }
+        wait(futures)
+
+        failed = []
+        for future, (output_path, kind, markdown_text) in futures.items():
+            if future.exception() is not None:
+                failed.append((output_path, future.exception()))
+            else:
+                # Done-callbacks may still be pending when wait() returns
+                self.manifest.record(output_path, markdown_text, kind)
+
+        self.manifest.prune_sources()
+        return len(futures) - len(failed), failed
+
+    def warm_up(self):
+        """Start the render processes now instead of on the first job."""
+        if self.max_workers <= 0:
+            _warm_up()
+            return
+        pool = self._get_pool()
+        wait([pool.submit(os.getpid) for _ in range(self.max_workers)])
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+@process_wide
+def get_render_service() -> RenderService:
+    """Return the process-wide render service (created on first use)."""
+    return RenderService()
@@ -0,0 +1,22 @@
+import threading
+from functools import wraps
+
+
+def process_wide(factory):
+    """
+    Decorator for get_x() functions: `factory` runs once, on first use
+    (thread-safe), and every later call returns the same object.
+    """
+    instance = None
+    lock = threading.Lock()
+
+    @wraps(factory)
+    def get():
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return get
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    """
+    Base of the local SQLite stores (LLM cache, cost ledger, job mirror,
+    France Travail sync state). Opening a store creates its file in WAL
+    mode, so readers do not block the writer, and runs its SCHEMA.
+    """
+
+    # CREATE TABLE / CREATE INDEX IF NOT EXISTS statements
+    SCHEMA = ()
+
+    def __init__(self, path: str):
+        self.path = path
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
@@ -0,0 +1,93 @@
+# Junk the model tends to append after the useful content.
+# Lines are matched on their stripped, lower-cased start; the agent
+# instructions marker is also matched mid-line (as clean_cv_artifacts does).
+AGENT_INSTRUCTIONS = "## agent instructions"
+
+# Everything from a stop marker on is dropped (the stream is aborted)
+CV_STOP_MARKERS = (AGENT_INSTRUCTIONS,)
+LETTER_STOP_MARKERS = ()
+
+# Lines dropped on their own, wherever they appear
+# (as remove_trailing_ai_sentence does)
+CV_SKIP_LINES = (
+    "cv adapté pour",
+    "cv adapte pour",
+)
+
+
+class StreamCleaner:
+    """
+    Incremental version of the worker's post-processing
+    (strip_markdown_fences, clean_cv_artifacts, remove_trailing_ai_sentence).
+
+    Feed it streamed chunks; feed() returns False as soon as the output
+    reaches a closing fence or a stop marker, so the caller can abort
+    the stream instead of paying for the junk that follows. Lines starting
+    with one of `skip_lines` are dropped and the stream goes on.
+    """
+
+    def __init__(self, stop_markers=(), skip_lines=()):
+        self.stop_markers = tuple(m.lower() for m in stop_markers)
+        self.skip_lines = tuple(m.lower() for m in skip_lines)
+        self.cut_agent_instructions = AGENT_INSTRUCTIONS in self.stop_markers
+        self.stopped = False
+        self._lines = []
+        self._partial = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; return False once the rest should be discarded."""
+        if self.stopped:
+            return False
+
+        self._partial += chunk
+        *complete, self._partial = self._partial.split("\n")
+
+        for line in complete:
+            if not self._accept(line):
+                return self._stop()
+
+        # The agent instructions marker can be caught before its line ends
+        if self.cut_agent_instructions and AGENT_INSTRUCTIONS in self._partial.lower():
+            self._accept(self._partial)
+            return self._stop()
+
+        return True
+
+    def text(self) -> str:
+        """Cleaned output so far (flushes the pending partial line)."""
+        if self._partial and not self.stopped:
+            self._accept(self._partial)
+            self._partial = ""
+        return "\n".join(self._lines).strip()
+
+    def _stop(self) -> bool:
+        self.stopped = True
+        self._partial = ""
+        return False
+
+    def _accept(self, line: str) -> bool:
+        """Keep the useful part of a line; return False if the output ends here."""
+        clean = line.strip()
+
+        if clean.startswith("```"):
+            # Opening ``` or ```markdown is dropped; a closing fence ends the output
+            return not self._started
+
+        if self.cut_agent_instructions:
+            index = line.lower().find(AGENT_INSTRUCTIONS)
+            if index >= 0:
+                if line[:index].strip():
+                    self._lines.append(line[:index].rstrip())
+                return False
+
+        lower = clean.lower()
+        if lower and any(lower.startswith(m) for m in self.stop_markers):
+            return False
+        if lower and any(lower.startswith(m) for m in self.skip_lines):
+            return True
+
+        if clean:
+            self._started = True
+        self._lines.append(line)
+        return True
@@ -0,0 +1,52 @@
+import os
+from fake_openai import start_fake_openai
+
+# Point the OpenAI client at the local stand-in (before the client is created)
+server, base_url = start_fake_openai()
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["OPENAI_API_KEY"] = "test"
+os.environ["LLM_CACHE_BYPASS"] = "1"
+
+from batch_runner import run_batch
+from cv_generator import build_cv_messages, CV_TEMPERATURE
+from letter_generator import build_letter_messages, LETTER_TEMPERATURE
+from worker import strip_markdown_fences
+
+
+def run_test():
+    with open("cv_default.md", "r", encoding="utf-8") as f:
+        cv_default = f.read()
+
+    jobs = {
+        "recTEST1": "Job title: Technicien chimie\nSource: TEST",
+        "recTEST2": "Job title: Ingénieur formulation\nSource: TEST",
+    }
+
+    print("--- 🚀 CV BATCH ---")
+    cvs = run_batch("test_cv", [
+        (record_id, build_cv_messages(cv_default, context), CV_TEMPERATURE)
+        for record_id, context in jobs.items()
+    ], poll_seconds=0.1)
+
+    for record_id, cv in cvs.items():
+        assert not isinstance(cv, Exception), cv
+        print(record_id, "→", strip_markdown_fences(cv).splitlines()[0])
+
+    print("--- 🚀 LETTER BATCH ---")
+    letters = run_batch("test_letter", [
+        (record_id, build_letter_messages(cvs[record_id], context), LETTER_TEMPERATURE)
+        for record_id, context in jobs.items()
+    ], poll_seconds=0.1)
+
+    for record_id, letter in letters.items():
+        assert not isinstance(letter, Exception), letter
+        print(record_id, "→", letter.splitlines()[0])
+
+    print("\n--- ✅ TEST COMPLETE ---")
+
+
+if __name__ == "__main__":
+    try:
+        run_test()
+    finally:
+        server.shutdown()
@@ -0,0 +1,134 @@
+"""
+Two worker processes on the same fake Airtable table: every job must be
+processed by exactly one of them, a job whose lease expired is taken over,
+and a job under a live lease is left alone. The second case throttles the
+table (the two workers together send more than it allows), so claims get
+429s and must start over without leaving jobs behind.
+
+    python worker/test_leases.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from fake_airtable import start_fake_airtable
+from fake_openai import start_fake_openai
+
+
+BASE_ID = "appLeaseTest"
+TABLE_NAME = "Jobs"
+JOBS = 10
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_worker(worker_id: str, env: dict) -> subprocess.Popen:
+    # Each process gets its own exports directory (run from a scratch cwd)
+    workdir = tempfile.mkdtemp(prefix=f"leases_{worker_id}_")
+    os.makedirs(os.path.join(workdir, "worker"))
+    shutil.copy(os.path.join(WORKER_DIR, "cv_default.md"), os.path.join(workdir, "worker"))
+
+    return subprocess.Popen(
+        [sys.executable, "-c", "import worker; worker.main(concurrency=3, use_cache=False)"],
+        cwd=workdir,
+        env={**env, "WORKER_ID": worker_id},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+
+
+def run_test(name: str, airtable_rps: float, settings: dict):
+    airtable, airtable_url = start_fake_airtable(max_rps=airtable_rps)
+    openai, openai_url = start_fake_openai(latency=1.5)
+    state = airtable.state
+
+    waiting = state.seed_waiting_jobs(BASE_ID, TABLE_NAME, JOBS)
+    stale = state.create(BASE_ID, TABLE_NAME, {
+        "title": "Lease expired", "Status": "processing",
+        "worker_id": "crashed", "lease_expires": "2020-01-01T00:00:00.000Z",
+    })["id"]
+    live = state.create(BASE_ID, TABLE_NAME, {
+        "title": "Lease held", "Status": "processing",
+        "worker_id": "other", "lease_expires": "2099-01-01T00:00:00.000Z",
+    })["id"]
+
+    # Who wrote each job's CV: one entry per record if no job ran twice
+    cv_writes = {}
+    update = state.update
+
+    def tracking_update(base_id, table_name, record_id, fields):
+        record = update(base_id, table_name, record_id, fields)
+        if "cv_custom" in fields and record is not None:
+            cv_writes.setdefault(record_id, []).append(record["fields"].get("worker_id"))
+        return record
+
+    state.update = tracking_update
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=WORKER_DIR,
+        AIRTABLE_API_URL=airtable_url,
+        AIRTABLE_BASE_ID=BASE_ID,
+        AIRTABLE_TABLE_NAME=TABLE_NAME,
+        AIRTABLE_API_KEY="test",
+        OPENAI_BASE_URL=openai_url,
+        OPENAI_API_KEY="test",
+        LLM_CACHE_BYPASS="1",
+        JOB_MIRROR="0",
+        LEASES="1",
+        **settings,
+    )
+
+    print(f"--- 🚀 TWO WORKERS, {name} ---")
+    try:
+        workers = [start_worker(worker_id, env) for worker_id in ("A", "B")]
+        outputs = [p.communicate()[0] for p in workers]
+    finally:
+        airtable.shutdown()
+        openai.shutdown()
+
+    records = state.table(BASE_ID, TABLE_NAME)
+    try:
+        for record_id in waiting + [stale]:
+            fields = records[record_id]["fields"]
+            writers = cv_writes.get(record_id, [])
+            print(f"{fields['title']:<32} {fields['Status']:<8} by {writers}")
+            assert fields["Status"] == "done", fields
+            assert len(writers) == 1, f"{record_id} processed {len(writers)} times"
+
+        assert records[live]["fields"]["Status"] == "processing"
+        assert records[live]["fields"]["worker_id"] == "other"
+        assert live not in cv_writes
+
+    except AssertionError:
+        for worker_id, output in zip(("A", "B"), outputs):
+            print(f"\n--- worker {worker_id} ---\n{output}")
+        raise
+
+    by_worker = {w: sum(1 for writers in cv_writes.values() if writers == [w]) for w in ("A", "B")}
+    print(
+        f"→ jobs per worker: {by_worker}, completions: {openai.state.completions}, "
+        f"Airtable throttled (429): {state.rate_limited}\n"
+    )
+
+
+if __name__ == "__main__":
+    run_test("table not throttled", 100, {
+        "AIRTABLE_MAX_RPS": "20",
+        "LEASE_TTL": "4",
+        "LEASE_HEARTBEAT": "1",
+        "LEASE_CLAIM_SETTLE": "0.3",
+    })
+    # 4 req/s per worker against a table allowing 5 in all
+    run_test("table throttled", 5, {
+        "AIRTABLE_MAX_RPS": "4",
+        "AIRTABLE_THROTTLE_BACKOFF": "1",
+        "LEASE_TTL": "20",
+        "LEASE_HEARTBEAT": "5",
+        "LEASE_CLAIM_SETTLE": "1",
+        "LEASE_CLAIM_ATTEMPTS": "10",
+    })
+    print("--- ✅ TEST COMPLETE ---")
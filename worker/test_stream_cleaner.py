@@ -0,0 +1,51 @@
+from stream_cleaner import StreamCleaner, CV_STOP_MARKERS, CV_SKIP_LINES, LETTER_STOP_MARKERS
+
+
+def clean(text: str, stop_markers=CV_STOP_MARKERS, skip_lines=CV_SKIP_LINES, chunk_size: int = 7):
+    """Feed `text` in small chunks, like a stream; returns (text, stream aborted)."""
+    cleaner = StreamCleaner(stop_markers, skip_lines)
+    aborted = False
+    for start in range(0, len(text), chunk_size):
+        if not cleaner.feed(text[start:start + chunk_size]):
+            aborted = True
+            break
+    return cleaner.text(), aborted
+
+
+def run_test():
+    print("--- 🚀 STREAM CLEANER ---")
+
+    # "CV adapté pour…" lines are dropped, the rest of the CV is kept
+    text, aborted = clean(
+        "```markdown\n"
+        "**JEAN - Ingénieur**\n"
+        "CV adapté pour le poste d'ingénieur procédés\n"
+        "\n"
+        "## EXPÉRIENCE\n"
+        "• Pilotage de lignes\n"
+        "CV adapte pour Société X\n"
+        "```\n"
+        "Voici votre CV adapté."
+    )
+    assert text == "**JEAN - Ingénieur**\n\n## EXPÉRIENCE\n• Pilotage de lignes", repr(text)
+    assert aborted, "closing fence should end the stream"
+    print("skip lines + closing fence →", repr(text))
+
+    # Agent instructions end the output, even mid-line and split across chunks
+    text, aborted = clean("**JEAN**\nFin du CV. ## AGENT INSTRUCTIONS\nNe pas afficher\n", chunk_size=3)
+    assert text == "**JEAN**\nFin du CV.", repr(text)
+    assert aborted
+    print("agent instructions →", repr(text))
+
+    # Without a fence or marker the whole text comes back, whatever the chunking
+    letter = "Paris, le 1 janvier 2025\n\nMadame, Monsieur,\n\nCV adapté pour vous.\n\nCordialement"
+    for chunk_size in (1, 5, len(letter)):
+        text, aborted = clean(letter, stop_markers=LETTER_STOP_MARKERS, skip_lines=(), chunk_size=chunk_size)
+        assert text == letter and not aborted, (chunk_size, repr(text))
+    print("letter kept as is →", len(letter), "chars")
+
+    print("\n--- ✅ TEST COMPLETE ---")
+
+
+if __name__ == "__main__":
+    run_test()
@@ -1,11 +1,25 @@
 import os
-import requests
+import argparse
+import itertools
+import queue
 import re
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-from cv_generator import generate_custom_cv
-from letter_generator import generate_cover_letter
-from pdf_exporter import export_markdown_to_pdf
-from pdf_exporter_letter import export_letter_to_pdf
+from cv_generator import generate_custom_cv, build_cv_messages, CV_TEMPERATURE
+from letter_generator import generate_cover_letter, build_letter_messages, LETTER_TEMPERATURE
+from render_service import get_render_service
+from http_session import get_session, pace_host
+from rate_limit import RateLimiter
+from airtable_writer import AirtableWriter
+from llm_dispatcher import get_dispatcher
+from batch_runner import run_batch
+from metrics import get_metrics, JOBS
+from cost_ledger import get_ledger, usage_context
+from lease import LeaseManager, lease_expired, EXPIRES_FIELD
+from job_mirror import get_job_mirror
+from daemon import Daemon, start_wake_server
 
 
 # --------------------------------------------------
@@ -20,13 +34,57 @@ AIRTABLE_TABLE_NAME = os.getenv("AIRTABLE_TABLE_NAME")
 
 CANDIDATE_NAME = os.getenv("CANDIDATE_NAME", "Candidat")
 
-AIRTABLE_URL = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
+# Override to point the worker at a local stand-in (see fake_airtable.py)
+AIRTABLE_API_URL = os.getenv("AIRTABLE_API_URL", "https://api.airtable.com/v0")
+
+AIRTABLE_URL = f"{AIRTABLE_API_URL}/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
 
 HEADERS = {
     "Authorization": f"Bearer {AIRTABLE_API_KEY}",
     "Content-Type": "application/json",
 }
 
+# Airtable allows 5 requests per second and per base; the limiter is shared
+# by all concurrent jobs. OpenAI limits are enforced by llm_dispatcher.
+# Kept below 5: with network jitter, 5 evenly paced requests can still
+# land 6 in one of Airtable's 1-second windows.
+AIRTABLE_MAX_RPS = float(os.getenv("AIRTABLE_MAX_RPS", "4"))
+
+AIRTABLE_LIMITER = RateLimiter(AIRTABLE_MAX_RPS)
+
+# After a 429 Airtable rejects every request for 30 seconds: the whole
+# limiter pauses that long before the request is retried.
+AIRTABLE_THROTTLE_BACKOFF = float(os.getenv("AIRTABLE_THROTTLE_BACKOFF", "30"))
+
+pace_host(AIRTABLE_API_URL, AIRTABLE_LIMITER, AIRTABLE_THROTTLE_BACKOFF)
+
+# Write-behind buffer: outputs and final statuses are merged per record and
+# sent as multi-record PATCHes. Only the "processing" claim is sent directly.
+AIRTABLE_WRITER = AirtableWriter(AIRTABLE_URL, HEADERS, limiter=AIRTABLE_LIMITER)
+
+# Job claiming: with LEASES=1, a lease (worker id, token, expiry) renewed
+# by a heartbeat, so several workers can share the table and crashed
+# workers' jobs are picked up again once their lease expires.
+LEASES = LeaseManager(
+    AIRTABLE_URL, HEADERS, AIRTABLE_WRITER,
+    limiter=AIRTABLE_LIMITER, throttle_backoff=AIRTABLE_THROTTLE_BACKOFF,
+)
+
+# LLM cost / tokens of the job, written with the final status. Off unless
+# set: Airtable rejects the whole PATCH (422) if a field does not exist.
+# IMPORTANT: create these number fields in Airtable before setting them.
+AIRTABLE_COST_FIELD = os.getenv("AIRTABLE_COST_FIELD", "")
+AIRTABLE_TOKENS_FIELD = os.getenv("AIRTABLE_TOKENS_FIELD", "")
+
+# Read the job queue from a local SQLite mirror synced incrementally
+# (see job_mirror.py) instead of scanning the Airtable table every run.
+USE_JOB_MIRROR = os.getenv("JOB_MIRROR", "1") != "0"
+
+# Background stage: PDF renders and Airtable persistence run here so the
+# job thread can move on to the next LLM call.
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "4"))
+STAGE_POOL = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
 
 # --------------------------------------------------
 # Utility functions
@@ -84,19 +142,129 @@ def extract_cv_title(markdown_text: str) -> str:
 # Airtable helpers
 # --------------------------------------------------
 
+# Only the fields read by the worker (skips the large cv_custom / cover_letter)
+JOB_FIELDS = ["title", "Source", "URL", "Status"] + ([EXPIRES_FIELD] if LEASES.enabled else [])
+
+
+def fetch_job_pages(formula: str):
+    """
+    Yield pages (lists of jobs) matching an Airtable formula.
+    Follows Airtable's `offset` so no record beyond the first 100 is skipped.
+    """
+    params = {
+        "fields[]": JOB_FIELDS,
+        "pageSize": 100,
+    }
+    if formula:
+        params["filterByFormula"] = formula
+
+    while True:
+        AIRTABLE_LIMITER.acquire()
+        with get_metrics().span("airtable_fetch") as span:
+            response = get_session().get(AIRTABLE_URL, headers=HEADERS, params=params)
+            response.raise_for_status()
+            data = response.json()
+            span["records"] = len(data.get("records", []))
+
+        yield data.get("records", [])
+
+        offset = data.get("offset")
+        if not offset:
+            return
+        params["offset"] = offset
+
+
+def fetch_jobs(formula: str):
+    """
+    Yield jobs matching an Airtable formula. Pages are loaded by a
+    background thread, independently of how fast jobs are consumed:
+    Airtable's offset iterators expire after a few minutes, so the next
+    page cannot wait for the previous page's jobs to be processed.
+    """
+    pages = queue.Queue()
+
+    def load():
+        try:
+            for page in fetch_job_pages(formula):
+                pages.put(page)
+            pages.put(None)
+        except Exception as e:
+            pages.put(e)
+
+    threading.Thread(target=load, name="airtable-fetch", daemon=True).start()
+
+    while True:
+        page = pages.get()
+        if page is None:
+            return
+        if isinstance(page, Exception):
+            raise page
+        yield from page
+
+
 def fetch_waiting_jobs():
-    """Fetch jobs with Status = 'waiting'."""
-    params = {"filterByFormula": "{Status}='waiting'"}
-    response = requests.get(AIRTABLE_URL, headers=HEADERS, params=params)
-    response.raise_for_status()
-    return response.json().get("records", [])
+    return fetch_jobs("{Status}='waiting'")
+
+
+def fetch_expired_jobs():
+    """Jobs left in 'processing' by a worker whose lease has expired."""
+    for job in fetch_jobs("{Status}='processing'"):
+        if lease_expired(job.get("fields", {})):
+            yield job
+
+
+def fetch_claimable_jobs(use_mirror: bool = False):
+    """Waiting jobs first, then expired leases (read once the waiting ones are done)."""
+    if use_mirror:
+        return fetch_claimable_jobs_from_mirror()
+    if not LEASES.enabled:
+        return fetch_waiting_jobs()
+    return itertools.chain(fetch_waiting_jobs(), fetch_expired_jobs())
+
+
+def apply_to_mirror(chunk):
+    """AirtableWriter hook: keep the mirror in step with what was sent."""
+    mirror = get_job_mirror()
+    for record_id, fields in chunk:
+        tracked = {k: v for k, v in fields.items() if k in JOB_FIELDS}
+        if not tracked:
+            continue
+        try:
+            mirror.apply(record_id, tracked)
+        except Exception as e:
+            # The next sync brings the mirror back in line
+            print(f"⚠️ Job mirror update failed: {e}")
+
+
+def fetch_claimable_jobs_from_mirror():
+    """
+    Sync the mirror (only records modified since the last sync are
+    fetched), then read the queue locally. The mirror may be slightly
+    stale: claims still check the record in Airtable (lease.py).
+    """
+    mirror = get_job_mirror()
+    with get_metrics().span("mirror_sync") as span:
+        span["records"] = mirror.sync(fetch_jobs)
+    print(f"→ Job mirror synced: {span['records']} record(s) fetched")
+
+    AIRTABLE_WRITER.on_sent = apply_to_mirror
+
+    waiting = mirror.jobs_with_status("waiting")
+    if not LEASES.enabled:
+        return waiting
+    expired = [
+        job for job in mirror.jobs_with_status("processing")
+        if lease_expired(job.get("fields", {}))
+    ]
+    return waiting + expired
 
 
 def update_job_fields(record_id: str, fields: dict):
     """Generic Airtable PATCH helper."""
     url = f"{AIRTABLE_URL}/{record_id}"
     payload = {"fields": fields}
-    response = requests.patch(url, headers=HEADERS, json=payload)
+    AIRTABLE_LIMITER.acquire()
+    response = get_session().patch(url, headers=HEADERS, json=payload)
     response.raise_for_status()
 
 
@@ -117,116 +285,485 @@ def strip_markdown_fences(text: str) -> str:
 # Main worker logic
 # --------------------------------------------------
 
-def main():
-    jobs = fetch_waiting_jobs()
+def build_job_context(fields: dict) -> str:
+    """Job context passed to the LLM prompts."""
+    clean_title = clean_job_title(fields.get("title", ""))
+
+    return f"""
+            Job title: {clean_title}
+            Source: {fields.get("Source", "")}
+            Job URL: {fields.get("URL", "")}
+        """
+
+
+def print_job_header(fields: dict):
+    # Single print so concurrent jobs do not interleave their headers
+    print(
+        "---- JOB ----\n"
+        f"Title        : {fields.get('title', '')}\n"
+        f"Source       : {fields.get('Source', '')}\n"
+        f"URL          : {fields.get('URL', '')}\n"
+        "-------------"
+    )
 
-    if not jobs:
-        print("No jobs with status = waiting.")
-        return
 
-    print(f"{len(jobs)} job(s) found.\n")
+def export_cv(cv_generated_clean: str) -> str:
+    """Export the CV PDF (rendered in the render pool) and return the CV title."""
+    # Retrieve cv title
+    cv_title= extract_cv_title(cv_generated_clean)
 
-    # Load default CV once
-    with open("worker/cv_default.md", "r", encoding="utf-8") as f:
-        cv_default_text = f.read()
+    # Export CV PDF
+    cv_pdf_path = f"exports/CV - {cv_title}.pdf"
 
-    for job in jobs:
-        record_id = job["id"]
-        fields = job.get("fields", {})
+    with get_metrics().span("render_cv", path=cv_pdf_path):
+        get_render_service().submit(cv_generated_clean, cv_pdf_path, "cv").result()
 
-        title = fields.get("title", "")
-        source = fields.get("Source", "")
-        url = fields.get("URL", "")
+    print(f"→ CV PDF exported: {cv_pdf_path}")
+    return cv_title
 
-        print("---- JOB ----")
-        print(f"Title        : {title}")
-        print(f"Source       : {source}")
-        print(f"URL          : {url}")
-        print("-------------")
 
-        try:
-            # Mark job as processing
-            update_job_fields(record_id, {"Status": "processing"})
-            print("→ Status set to 'processing'")
-
-            clean_title = clean_job_title(title)
-
-            # Build job context (for LLM only)
-            job_context = f"""
-                Job title: {clean_title}
-                Source: {source}
-                Job URL: {url}
-            """
-
-            # -----------------------------
-            # Generate tailored CV
-            # -----------------------------
+def export_letter(cover_letter: str, cv_title: str):
+    # Export cover letter PDF
+    letter_pdf_path = f"exports/Lettre - {cv_title}.pdf"
+
+    with get_metrics().span("render_letter", path=letter_pdf_path):
+        get_render_service().submit(cover_letter, letter_pdf_path, "letter").result()
+
+    print(f"→ Cover letter PDF exported: {letter_pdf_path}")
+
+
+def cost_fields(record_id: str) -> dict:
+    """Airtable fields with the job's LLM cost and tokens in this run."""
+    totals = get_ledger().job_totals(record_id)
+    fields = {}
+    if AIRTABLE_COST_FIELD:
+        fields[AIRTABLE_COST_FIELD] = round(totals["cost_usd"], 6)
+    if AIRTABLE_TOKENS_FIELD:
+        fields[AIRTABLE_TOKENS_FIELD] = totals["tokens"]
+    return fields
+
+
+def mark_job_error(record_id: str, error):
+    print(f"❌ Error while processing job {record_id}: {error}")
+    # IMPORTANT: ensure this value exists in Airtable Status options
+    AIRTABLE_WRITER.update(
+        record_id, {"Status": "error", **cost_fields(record_id), **LEASES.release(record_id)}
+    )
+    get_metrics().inc(JOBS, status="error")
+
+
+def claim_job(record_id: str) -> bool:
+    """
+    Take the job's lease. A claim that fails (HTTP error) counts as not
+    claimed: the record may belong to another worker, so it is left as is.
+    """
+    try:
+        with get_metrics().span("claim", record_id=record_id) as span:
+            span["claimed"] = LEASES.claim(record_id)
+    except Exception as e:
+        print(f"⚠️ Claim failed, job skipped: {e}\n")
+        return False
+
+    if not span["claimed"]:
+        print("→ Job not claimed, skipped\n")
+    return span["claimed"]
+
+
+def persist_cv(record_id: str, cv_generated_clean: str) -> str:
+    """Background stage: save the CV to Airtable, export its PDF, return the CV title."""
+    AIRTABLE_WRITER.update(record_id, {"cv_custom":  cv_generated_clean})
+    print("→ Custom CV queued for Airtable")
+
+    return export_cv(cv_generated_clean)
+
+
+def persist_letter(record_id: str, cover_letter: str, cv_future: Future):
+    """
+    Background stage: once the CV is exported, save and export the letter,
+    then set the final status (error if any background step failed).
+    """
+    try:
+        # Same order as the sequential pipeline: a failed CV export fails the job
+        cv_title = cv_future.result()
+
+        AIRTABLE_WRITER.update(record_id, {"cover_letter": cover_letter})
+        print("→ Cover letter queued for Airtable")
+
+        export_letter(cover_letter, cv_title)
+
+        # Final status (sent in the same batched update as the outputs)
+        AIRTABLE_WRITER.update(
+            record_id, {"Status": "done", **cost_fields(record_id), **LEASES.release(record_id)}
+        )
+        get_metrics().inc(JOBS, status="done")
+        print("→ Status set to 'done'\n")
+
+    except Exception as e:
+        mark_job_error(record_id, e)
+
+
+def process_job(job: dict, cv_default_text: str) -> Future | None:
+    """
+    Run the full CV + cover letter pipeline for one Airtable record.
+
+    Only the LLM calls run on the calling thread: the CV export and the
+    Airtable writes are handed to STAGE_POOL as soon as the CV exists, and
+    the letter stage follows. Returns the future of the final stage
+    (already done if the job failed), or None if the job was not claimed.
+    """
+    record_id = job["id"]
+    fields = job.get("fields", {})
+
+    print_job_header(fields)
+
+    # Stop claiming once the run budget is spent; the job stays waiting
+    if get_ledger().budget_reached():
+        print(f"→ Budget reached, job left waiting: {record_id}\n")
+        return None
+
+    metrics = get_metrics()
+
+    # Claim the job (lease), unless another worker got it first
+    if not claim_job(record_id):
+        return None
+    if LEASES.enabled:
+        print(f"→ Status set to 'processing' (lease held by {LEASES.worker_id})")
+    else:
+        print("→ Status set to 'processing'")
+
+    try:
+        # Build job context (for LLM only)
+        job_context = build_job_context(fields)
+
+        # -----------------------------
+        # Generate tailored CV
+        # -----------------------------
+        with metrics.span("llm_cv", record_id=record_id), usage_context(record_id, "cv"):
             custom_cv = generate_custom_cv(cv_default_text, job_context)
-            cv_generated_clean = strip_markdown_fences(custom_cv)
+        cv_generated_clean = strip_markdown_fences(custom_cv)
+        print("→ Custom CV generated")
+
+        cv_future = STAGE_POOL.submit(persist_cv, record_id, cv_generated_clean)
 
-            # Retrieve cv title
-            cv_title= extract_cv_title(cv_generated_clean)
+        # -----------------------------
+        # Generate cover letter
+        # -----------------------------
+        with metrics.span("llm_letter", record_id=record_id), usage_context(record_id, "letter"):
+            cover_letter = generate_cover_letter(cv_generated_clean, job_context)
+        print("→ Cover letter generated")
 
-            update_job_fields(record_id, {"cv_custom":  cv_generated_clean})
-            print("→ Custom CV generated and saved")
+        return STAGE_POOL.submit(persist_letter, record_id, cover_letter, cv_future)
 
-            # Export CV PDF
-            cv_pdf_path = f"exports/CV - {cv_title}.pdf"
+    except Exception as e:
+        mark_job_error(record_id, e)
+        failed = Future()
+        failed.set_result(None)
+        return failed
 
-            tmp_cv_path = cv_pdf_path.replace(".pdf", "_NEW.pdf")
 
-            export_markdown_to_pdf(
-                markdown_text= cv_generated_clean,
-                output_path=tmp_cv_path
-            )
+def main_batch(use_cache: bool = True, use_mirror: bool = USE_JOB_MIRROR):
+    """
+    Bulk mode: all CVs go through one OpenAI Batch API job, then all
+    letters through a second one (50% cheaper, no per-minute limits,
+    results within 24h). PDFs and Airtable updates follow each batch.
+    """
+    if not use_cache:
+        get_dispatcher().use_cache = False
 
+    with open("worker/cv_default.md", "r", encoding="utf-8") as f:
+        cv_default_text = f.read()
 
-            # Try to replace existing file
+    # Claim every job first, so other workers do not pick them up; the
+    # leases are renewed by the heartbeat while the batches run.
+    jobs = {}
+    try:
+        for job in fetch_claimable_jobs(use_mirror):
+            record_id = job["id"]
+            print_job_header(job.get("fields", {}))
+            if not claim_job(record_id):
+                continue
+            jobs[record_id] = build_job_context(job.get("fields", {}))
+
+        if not jobs:
+            print("No jobs with status = waiting.")
+            return
+
+        print(f"{len(jobs)} job(s) claimed for batch processing.\n")
+
+        # -----------------------------
+        # CV batch
+        # -----------------------------
+        cv_outputs = run_batch("cv", [
+            (record_id, build_cv_messages(cv_default_text, job_context), CV_TEMPERATURE)
+            for record_id, job_context in jobs.items()
+        ])
+
+        cvs = {}
+        for record_id, output in cv_outputs.items():
             try:
-                if os.path.exists(cv_pdf_path):
-                    os.replace(tmp_cv_path, cv_pdf_path)
-                else:
-                    os.rename(tmp_cv_path, cv_pdf_path)
-            except PermissionError:
-                raise RuntimeError(
-                    f"Le fichier PDF est ouvert. "
-                    f"Fermez-le puis relancez le worker : {cv_pdf_path}"
+                if isinstance(output, Exception):
+                    raise output
+                cv_generated_clean = strip_markdown_fences(output)
+                AIRTABLE_WRITER.update(record_id, {"cv_custom": cv_generated_clean})
+                cvs[record_id] = (cv_generated_clean, export_cv(cv_generated_clean))
+            except Exception as e:
+                mark_job_error(record_id, e)
+
+        # -----------------------------
+        # Letter batch
+        # -----------------------------
+        letter_outputs = run_batch("letter", [
+            (record_id, build_letter_messages(cv_text, jobs[record_id]), LETTER_TEMPERATURE)
+            for record_id, (cv_text, _) in cvs.items()
+        ])
+
+        for record_id, output in letter_outputs.items():
+            try:
+                if isinstance(output, Exception):
+                    raise output
+                AIRTABLE_WRITER.update(record_id, {"cover_letter": output})
+                export_letter(output, cvs[record_id][1])
+                AIRTABLE_WRITER.update(
+                    record_id, {"Status": "done", **cost_fields(record_id), **LEASES.release(record_id)}
                 )
-            
-            print(f"→ CV PDF exported: {cv_pdf_path}")
+                get_metrics().inc(JOBS, status="done")
+            except Exception as e:
+                mark_job_error(record_id, e)
+    finally:
+        LEASES.stop()
+        AIRTABLE_WRITER.flush()
+        get_metrics().write_textfile()
 
-            # -----------------------------
-            # Generate cover letter
-            # -----------------------------
-            cover_letter = generate_cover_letter(cv_generated_clean, job_context)
+    print(f"{len(jobs)} job(s) processed in batch mode.")
 
-            update_job_fields(record_id, {"cover_letter": cover_letter})
-            print("→ Cover letter generated and saved")
 
-            # Export cover letter PDF
-            letter_pdf_path = f"exports/Lettre - {cv_title}.pdf"
+def rebuild_exports():
+    """Re-render only the PDFs whose renderer version changed or that are missing."""
+    rendered, failed = get_render_service().rebuild_stale()
 
-            if os.path.exists(letter_pdf_path):
-                os.remove(letter_pdf_path)
+    for output_path, error in failed:
+        print(f"❌ Error while rendering {output_path}: {error}")
 
+    print(f"{rendered} PDF(s) re-rendered, {len(failed)} failed.")
 
-            export_letter_to_pdf(
-                cover_letter,
-                letter_pdf_path
-            )
 
+def main(concurrency: int = 1, use_cache: bool = True, stream: bool = False,
+         max_cost: float | None = None, max_tokens: int | None = None,
+         use_mirror: bool = USE_JOB_MIRROR) -> int:
+    """Process the claimable jobs once; returns how many this worker claimed."""
+    ledger = get_ledger()
+    ledger.set_budget(max_cost=max_cost, max_tokens=max_tokens)
 
-            print(f"→ Cover letter PDF exported: {letter_pdf_path}")
+    dispatcher = get_dispatcher()
+    if not use_cache:
+        dispatcher.use_cache = False
+    if stream:
+        dispatcher.use_stream = True
 
-            # Final status
-            update_job_fields(record_id, {"Status": "done"})
-            print("→ Status set to 'done'\n")
+    # The ledger and the usage log live as long as the process (the daemon
+    # runs main() once per poll): the summary covers this call only.
+    started = time.time()
+    first_call = dispatcher.usage_summary()["calls"]
 
-        except Exception as e:
-            print(f"❌ Error while processing job {record_id}: {e}")
-            # IMPORTANT: ensure this value exists in Airtable Status options
-            update_job_fields(record_id, {"Status": "error"})
+    # Load default CV once
+    with open("worker/cv_default.md", "r", encoding="utf-8") as f:
+        cv_default_text = f.read()
+
+    # Jobs are streamed: processing starts while later pages are loading
+    # (with the mirror, the queue is read locally once synced)
+    jobs = fetch_claimable_jobs(use_mirror)
+    count = 0
+    stages = []
+
+    try:
+        if concurrency <= 1:
+            for job in jobs:
+                if ledger.budget_reached():
+                    break
+                count += 1
+                stages.append(process_job(job, cv_default_text))
+        else:
+            # Jobs are independent: Airtable and OpenAI limits are enforced by
+            # the shared limiters, so N jobs can safely be in flight at once.
+            # Jobs queued when the budget runs out are skipped by process_job.
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                futures = []
+                for job in jobs:
+                    if ledger.budget_reached():
+                        break
+                    count += 1
+                    futures.append(pool.submit(process_job, job, cv_default_text))
+                for future in futures:
+                    stages.append(future.result())
+    finally:
+        # Background renders / writes must finish before the final flush
+        wait([f for f in stages if f is not None])
+        LEASES.stop()
+        # Send whatever is still buffered (last < 10 records)
+        try:
+            AIRTABLE_WRITER.flush()
+        finally:
+            get_metrics().write_textfile()
+
+    # Jobs not claimed (taken by another worker, claim failed, budget) do
+    # not count: the daemon backs off when a poll claimed nothing.
+    claimed = sum(1 for f in stages if f is not None)
+    if not claimed:
+        if ledger.budget_reached():
+            print("Budget reached: no job claimed, remaining jobs were left waiting.")
+        elif count:
+            print(f"No job claimed ({count} skipped).")
+        else:
+            print("No jobs with status = waiting.")
+        return 0
+
+    skipped = f", {count - claimed} skipped" if count > claimed else ""
+    print(f"{claimed} job(s) processed{skipped}.")
+
+    usage = dispatcher.usage_summary(start=first_call)
+    print(
+        f"OpenAI concurrency limit: {dispatcher.concurrency_limit}, "
+        f"queue depth: {dispatcher.queue_depth}"
+    )
+    print(
+        f"OpenAI calls: {usage['calls']}, "
+        f"prompt tokens: {usage['prompt_tokens']} "
+        f"({usage['cached_tokens']} cached, {usage['cache_hit_rate']:.0%})"
+    )
+
+    stage_costs = ledger.stage_totals(since=started)
+    by_stage = ", ".join(f"{stage} ${t['cost_usd']:.4f}" for stage, t in sorted(stage_costs.items()))
+    cost = sum(t["cost_usd"] for t in stage_costs.values())
+    tokens = sum(t["tokens"] for t in stage_costs.values())
+    print(f"Cost this run: ${cost:.4f} for {tokens} tokens ({by_stage or 'no calls'})")
+    if ledger.budget_reached():
+        print("Budget reached: remaining jobs were left waiting.")
+    return claimed
+
+
+def run_daemon(concurrency: int = 1, use_cache: bool = True, stream: bool = False,
+               max_cost: float | None = None, max_tokens: int | None = None,
+               use_mirror: bool = USE_JOB_MIRROR):
+    """
+    Long-running mode: the OpenAI client, render processes and caches stay
+    warm between polls. Polls back off while the queue is empty; POST /wake
+    on the local endpoint polls right away. The budget covers the whole
+    daemon lifetime.
+    """
+    get_render_service().warm_up()
+    # Creates the OpenAI client (and its connection pool) before the first job
+    get_dispatcher().client
+
+    def run_once() -> int:
+        processed = main(
+            concurrency=concurrency,
+            use_cache=use_cache,
+            stream=stream,
+            max_cost=max_cost,
+            max_tokens=max_tokens,
+            use_mirror=use_mirror,
+        )
+        if get_ledger().budget_reached():
+            print("Budget reached: stopping the daemon.")
+            daemon.stop()
+        return processed
+
+    daemon = Daemon(run_once)
+    daemon.install_signal_handlers()
+    try:
+        server = start_wake_server(daemon)
+    except OSError as e:
+        # e.g. another daemon already listens on DAEMON_WAKE_PORT (0 picks a free port)
+        server = None
+        print(f"⚠️ Wake endpoint disabled, polling only: {e}")
+        print("→ Daemon started")
+    else:
+        host, port = server.server_address[:2]
+        print(f"→ Daemon started, wake with: curl -X POST http://{host}:{port}/wake")
+
+    try:
+        daemon.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+        get_render_service().shutdown()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="GenAI Jobs worker")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="run",
+        choices=["run", "daemon", "rebuild-exports"],
+        help="run: process waiting jobs (default); "
+             "daemon: keep running and poll for new jobs; "
+             "rebuild-exports: re-render stale PDFs only",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="number of jobs processed in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore the on-disk LLM cache and always call OpenAI",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream LLM outputs and stop as soon as junk sections start",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="use the OpenAI Batch API (cheaper, results within 24h)",
+    )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        help="stop claiming new jobs once this run has spent this many USD",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        help="stop claiming new jobs once this run has used this many tokens",
+    )
+    parser.add_argument(
+        "--no-mirror",
+        action="store_true",
+        help="scan Airtable for jobs instead of using the local job mirror",
+    )
+    args = parser.parse_args()
+
+    if args.batch and (args.max_cost is not None or args.max_tokens is not None):
+        # Batch costs are only known once the whole batch has completed
+        parser.error("--max-cost / --max-tokens cannot be used with --batch")
+
+    if args.command == "daemon" and args.batch:
+        parser.error("--batch cannot be used with the daemon command")
+
+    if args.command == "rebuild-exports":
+        rebuild_exports()
+    elif args.command == "daemon":
+        run_daemon(
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+            stream=args.stream,
+            max_cost=args.max_cost,
+            max_tokens=args.max_tokens,
+            use_mirror=USE_JOB_MIRROR and not args.no_mirror,
+        )
+    elif args.batch:
+        main_batch(use_cache=not args.no_cache, use_mirror=USE_JOB_MIRROR and not args.no_mirror)
+    else:
+        main(
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+            stream=args.stream,
+            max_cost=args.max_cost,
+            max_tokens=args.max_tokens,
+            use_mirror=USE_JOB_MIRROR and not args.no_mirror,
+        )